@@ -0,0 +1,2228 @@
+# Motor compartido de Flash Point: tablero, grafo, registro de eventos, repeticiones, lotes paralelos, barridos,
+# servidor y línea de comandos. FlashPointIntelligent.py y FlashPointRandom.py solo definen sus bomberos, su
+# modelo, process_file y simulate; las funciones de este módulo reciben como primer argumento el módulo del juego
+# (variant) con el que deben jugar.
+
+# Importamos los siguientes paquetes para el mejor manejo de valores numéricos.
+# pandas y pyarrow se importan dentro de las funciones que los usan, para que importar este módulo (el servidor,
+# los procesos del pool) no pague su costo
+import numpy as np
+
+# Definimos otros paquetes que vamos a usar para medir el tiempo de ejecución de nuestro algoritmo.
+import time
+import random
+
+import heapq
+import struct
+import csv
+import itertools
+import importlib
+import os
+import io
+import threading
+import multiprocessing
+import concurrent.futures
+from collections import OrderedDict
+from typing import List, Tuple, NamedTuple, Optional
+
+import json
+import codecs
+import uuid
+import gzip
+import hashlib
+import logging
+
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures.process import BrokenProcessPool
+
+class Wall():
+    def __init__(self, id, top, left, bottom, right, isDoor=0, isOpen=False):
+        # Asignar un identificador único a la pared
+        self.unique_id = id
+
+        # Establecer las propiedades de la pared para cada lado (arriba, abajo, izquierda, derecha)
+        self.top = top
+        self.bottom = bottom
+        self.left = left
+        self.right = right
+
+        # Especificar si la pared tiene una puerta (0 indica que no hay puerta)
+        self.isDoor = isDoor
+
+        # Booleano que indica si la puerta está actualmente abierta
+        self.isOpen = isOpen
+
+        # Inicializar la salud de las paredes (4 veces el valor de presencia de la pared)
+        self.topHealth = 4 * top
+        self.bottomHealth = 4 * bottom
+        self.leftHealth = 4 * left
+        self.rightHealth = 4 * right
+
+        # Ajustar las propiedades de la pared si hay una puerta presente
+        if self.isDoor != 0:
+            if self.isDoor == 1:  # Puerta en la parte superior
+                self.top = 2  # Cambiar pared superior para representar una puerta
+                self.topHealth = 2  # Establecer salud para la puerta
+            if self.isDoor == 2:  # Puerta en la izquierda
+                self.left = 2  # Cambiar pared izquierda para representar una puerta
+                self.leftHealth = 2  # Establecer salud para la puerta
+            if self.isDoor == 3:  # Puerta en la parte inferior
+                self.bottom = 2  # Cambiar pared inferior para representar una puerta
+                self.bottomHealth = 2  # Establecer salud para la puerta
+            if self.isDoor == 4:  # Puerta en la derecha
+                self.right = 2  # Cambiar pared derecha para representar una puerta
+                self.rightHealth = 2  # Establecer salud para la puerta
+
+class Tile():
+    def __init__(self, id, top, left, bottom, right, isDoor, isOpen=False):
+        # Asignar un identificador único a la casilla
+        self.unique_id = id
+
+        # Inicializar la posición de la casilla (por defecto es None)
+        self.pos = None
+
+        # Crear un objeto Wall para la casilla con las propiedades de pared proporcionadas
+        self.wall = self.createWall(id, top, left, bottom, right, isDoor, isOpen)
+
+        # Inicializar el estado de fuego de la casilla (0 indica que no hay fuego)
+        self.fireStatus = 0
+
+        # Booleano que indica si la casilla tiene un Punto de Interés (POI)
+        self.hasPOI = False
+
+        # Contador para el número de víctimas presentes en la casilla
+        self.numberOfVictims = 0
+
+        # Lista para contener bomberos asignados a la casilla
+        self.hasFireFighter = []
+
+        # Referencia a un POI (Punto de Interés) asociado con la casilla
+        self.poi = None
+
+    def createWall(self, id, top, left, bottom, right, isDoor, isOpen):
+        # Pared normal; ArrayTile la crea como vista sobre los arreglos del estado
+        return Wall(id, top, left, bottom, right, isDoor, isOpen)
+
+def stateField(name):
+    # Crear una propiedad que lee y escribe el arreglo ``name`` del BoardState en la posición de la casilla;
+    # item() devuelve directamente el int o bool de Python, sin crear un escalar de NumPy
+    def getter(self):
+        return getattr(self._state, name).item(self._index)
+
+    def setter(self, value):
+        getattr(self._state, name)[self._index] = value
+
+    return property(getter, setter)
+
+def wallSideField(name, side):
+    # Crear una propiedad que lee y escribe un lado (0 arriba, 1 izquierda, 2 abajo, 3 derecha) del arreglo ``name``
+    def getter(self):
+        return getattr(self._state, name).item(self._index[0], self._index[1], side)
+
+    def setter(self, value):
+        getattr(self._state, name)[self._index[0], self._index[1], side] = value
+
+    return property(getter, setter)
+
+class BoardState():
+    # Tipos de POI codificados como enteros (0 sin POI, 1 víctima, 2 falsa alarma)
+    POI_TYPES = (None, "v", "f")
+
+    def __init__(self, width, height):
+        # Dimensiones de la cuadrícula (incluyendo el borde exterior), los arreglos se indexan por (x, y)
+        self.width = width
+        self.height = height
+
+        # Estado de fuego de cada casilla (0 nada, 1 humo, 2 fuego)
+        self.fireStatus = np.zeros((width, height), dtype=np.int8)
+
+        # Puntos de Interés: si hay uno, su tipo codificado y el número de víctimas en la casilla
+        self.hasPOI = np.zeros((width, height), dtype=bool)
+        self.poi = np.zeros((width, height), dtype=np.int8)
+        self.numberOfVictims = np.zeros((width, height), dtype=np.int16)
+
+        # Tipo de pared (0 nada, 1 pared, 2 puerta) y salud de cada lado de cada casilla
+        self.wallType = np.zeros((width, height, 4), dtype=np.int8)
+        self.wallHealth = np.zeros((width, height, 4), dtype=np.int16)
+
+        # Lado de la puerta de cada casilla (0 sin puerta) y si está abierta
+        self.isDoor = np.zeros((width, height), dtype=np.int8)
+        self.isOpen = np.zeros((width, height), dtype=bool)
+
+class ArrayWall(Wall):
+    # Pared cuyo estado vive en un BoardState compartido; se comporta igual que Wall
+    top = wallSideField("wallType", 0)
+    left = wallSideField("wallType", 1)
+    bottom = wallSideField("wallType", 2)
+    right = wallSideField("wallType", 3)
+    topHealth = wallSideField("wallHealth", 0)
+    leftHealth = wallSideField("wallHealth", 1)
+    bottomHealth = wallSideField("wallHealth", 2)
+    rightHealth = wallSideField("wallHealth", 3)
+    isDoor = stateField("isDoor")
+    isOpen = stateField("isOpen")
+
+    def __init__(self, state, id, top, left, bottom, right, isDoor=0, isOpen=False):
+        # Guardar el estado compartido y la posición antes de que Wall asigne sus valores iniciales
+        self._state = state
+        self._index = id  # El id de la pared es la posición (x, y) de su casilla
+        super().__init__(id, top, left, bottom, right, isDoor, isOpen)
+
+class ArrayTile(Tile):
+    # Casilla cuyo estado vive en un BoardState compartido; se comporta igual que Tile
+    fireStatus = stateField("fireStatus")
+    hasPOI = stateField("hasPOI")
+    numberOfVictims = stateField("numberOfVictims")
+
+    def __init__(self, state, id, top, left, bottom, right, isDoor, isOpen=False):
+        # Guardar el estado compartido y la posición antes de que Tile asigne sus valores iniciales
+        self._state = state
+        self._index = id  # El id de la casilla es su posición (x, y)
+        super().__init__(id, top, left, bottom, right, isDoor, isOpen)
+
+    def createWall(self, id, top, left, bottom, right, isDoor, isOpen):
+        # La pared de la casilla es una vista sobre los arreglos del estado
+        return ArrayWall(self._state, id, top, left, bottom, right, isDoor, isOpen)
+
+    @property
+    def poi(self):
+        # Decodificar el tipo de POI guardado como entero
+        return BoardState.POI_TYPES[self._state.poi.item(self._index)]
+
+    @poi.setter
+    def poi(self, value):
+        # Codificar el tipo de POI como entero
+        self._state.poi[self._index] = BoardState.POI_TYPES.index(value)
+
+class PathCache():
+    # Caché LRU de rutas más cortas indexada por (versión del grafo, inicio, objetivo)
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize  # Número máximo de rutas guardadas
+        self.entries = OrderedDict()  # Rutas guardadas, de la menos a la más recientemente usada
+        self.hits = 0  # Consultas respondidas desde la caché
+        self.misses = 0  # Consultas que tuvieron que calcular la ruta
+
+    def get(self, key):
+        # Devolver una copia de la ruta guardada para la llave, o None si no está
+        path = self.entries.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)  # Marcar la ruta como la más recientemente usada
+        self.hits += 1
+        return list(path)
+
+    def put(self, key, path):
+        # Guardar la ruta y desalojar la menos recientemente usada si se supera el tamaño máximo
+        self.entries[key] = tuple(path)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def hitRate(self):
+        # Proporción de consultas respondidas desde la caché
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+class GraphRow():
+    # Vista de los arcos que salen de un nodo de CompactGraph, con la interfaz de un diccionario {vecino: costo}
+    # para que graph[pos][neighbor] siga funcionando igual que con el grafo de diccionarios
+    __slots__ = ("graph", "node")
+
+    def __init__(self, graph, node):
+        self.graph = graph  # Grafo compacto al que pertenece la fila
+        self.node = node  # Nodo de origen de los arcos
+
+    def __getitem__(self, neighbor):
+        slot = self.graph.edgeIndex.get((self.node, neighbor))
+        if slot is None:
+            raise KeyError(neighbor)
+        return int(self.graph.weights[slot])
+
+    def __setitem__(self, neighbor, weight):
+        # La estructura del grafo es fija: solo se puede cambiar el costo de un arco existente
+        slot = self.graph.edgeIndex.get((self.node, neighbor))
+        if slot is None:
+            raise KeyError(neighbor)
+        self.graph.setWeight(slot, weight)
+
+    def get(self, neighbor, default=None):
+        slot = self.graph.edgeIndex.get((self.node, neighbor))
+        return default if slot is None else int(self.graph.weights[slot])
+
+    def __contains__(self, neighbor):
+        return (self.node, neighbor) in self.graph.edgeIndex
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        i = self.graph.index[self.node]
+        return self.graph.indptr[i + 1] - self.graph.indptr[i]
+
+    def keys(self):
+        i = self.graph.index[self.node]
+        return [self.graph.nodes[j] for j in self.graph.indices[self.graph.indptr[i]:self.graph.indptr[i + 1]]]
+
+    def values(self):
+        i = self.graph.index[self.node]
+        return self.graph.weights[self.graph.indptr[i]:self.graph.indptr[i + 1]].tolist()
+
+    def items(self):
+        return list(zip(self.keys(), self.values()))
+
+class CompactGraph():
+    # Grafo en formato CSR: nodos identificados por enteros, vecinos en un arreglo plano y costos en un arreglo de NumPy.
+    # Los identificadores siguen el orden de las tuplas (x, y) y los vecinos conservan el orden del diccionario original,
+    # así que las búsquedas desempatan exactamente igual que sobre el grafo de diccionarios
+    def __init__(self, graph):
+        extra = {neighbor for neighbors in graph.values() for neighbor in neighbors if neighbor not in graph}
+        self.nodes = sorted(set(graph) | extra)  # Nodo (x, y) de cada identificador
+        self.index = {node: i for i, node in enumerate(self.nodes)}  # Identificador de cada nodo
+        self.rows = [node in graph for node in self.nodes]  # Si el nodo tiene fila propia en el grafo original
+
+        indptr = [0]
+        indices = []
+        weights = []
+        for node in self.nodes:
+            for neighbor, weight in graph.get(node, {}).items():
+                indices.append(self.index[neighbor])
+                weights.append(weight)
+            indptr.append(len(indices))
+
+        self.indptr = indptr  # Inicio de los arcos de cada nodo en indices y weights
+        self.indices = indices  # Identificador del vecino de cada arco
+        self.weights = np.array(weights, dtype=np.int32)  # Costo de cada arco
+        self.weightList = None  # Copia de los costos como lista de Python para las búsquedas, se rehace al cambiar un costo
+        self.xs = np.array([node[0] for node in self.nodes])  # Coordenada x de cada nodo, para heurísticas vectorizadas
+        self.ys = np.array([node[1] for node in self.nodes])  # Coordenada y de cada nodo
+
+        # Posición de cada arco (nodo, vecino) en los arreglos, para el acceso graph[pos][neighbor]
+        self.edgeIndex = {}
+        for i, node in enumerate(self.nodes):
+            for slot in range(indptr[i], indptr[i + 1]):
+                self.edgeIndex[(node, self.nodes[indices[slot]])] = slot
+
+    def copy(self):
+        # Copia para otra partida: la estructura es fija y se comparte, solo los costos se copian
+        graph = CompactGraph.__new__(CompactGraph)
+        graph.__dict__.update(self.__dict__)
+        graph.weights = self.weights.copy()
+        graph.weightList = None
+        return graph
+
+    def setWeight(self, slot, weight):
+        # Cambiar el costo de un arco e invalidar la copia en lista
+        self.weights[slot] = weight
+        self.weightList = None
+
+    def searchWeights(self):
+        # Costos como lista de Python; leer elementos sueltos de un arreglo de NumPy es más lento que de una lista
+        if self.weightList is None:
+            self.weightList = self.weights.tolist()
+        return self.weightList
+
+    def __getitem__(self, node):
+        if not self.rows[self.index[node]]:
+            raise KeyError(node)
+        return GraphRow(self, node)
+
+    def get(self, node, default=None):
+        return GraphRow(self, node) if node in self else default
+
+    def __contains__(self, node):
+        i = self.index.get(node)
+        return i is not None and self.rows[i]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return sum(self.rows)
+
+    def keys(self):
+        return [node for node, hasRow in zip(self.nodes, self.rows) if hasRow]
+
+    def values(self):
+        return [GraphRow(self, node) for node in self.keys()]
+
+    def items(self):
+        return [(node, GraphRow(self, node)) for node in self.keys()]
+
+class ShortestPathTable():
+    # Tabla de distancias y siguiente salto entre todos los pares de nodos del grafo (Floyd-Warshall en NumPy),
+    # que se actualiza de forma incremental cuando baja el costo de un arco
+    def __init__(self, graph):
+        self.graph = graph  # Grafo de adyacencia {nodo: {vecino: costo}}
+        self.nodes = list(graph)  # Nodos en orden fijo
+        self.index = {node: i for i, node in enumerate(self.nodes)}  # Índice de cada nodo en las matrices
+        self.rebuild()
+
+    def rebuild(self):
+        # Inicializar las matrices con los arcos directos y ejecutar Floyd-Warshall completo
+        n = len(self.nodes)
+        self.dist = np.full((n, n), np.inf)
+        self.nextHop = np.full((n, n), -1, dtype=np.int32)
+        for node, neighbors in self.graph.items():
+            i = self.index[node]
+            self.dist[i, i] = 0
+            self.nextHop[i, i] = i
+            for neighbor, weight in neighbors.items():
+                j = self.index[neighbor]
+                self.dist[i, j] = weight
+                self.nextHop[i, j] = j
+
+        for k in range(n):
+            # Relajar todos los pares a través del nodo k en una sola operación
+            candidate = self.dist[:, k, None] + self.dist[None, k, :]
+            better = candidate < self.dist
+            self.dist = np.where(better, candidate, self.dist)
+            self.nextHop = np.where(better, self.nextHop[:, k, None], self.nextHop)
+
+    def updateEdge(self, node1, node2, oldWeight, weight):
+        # Si el arco se encarece, las rutas que lo usaban pueden cambiar de cualquier forma: recalcular todo
+        if oldWeight is None or weight > oldWeight:
+            self.rebuild()
+            return
+
+        # Si el arco se abarata, solo pueden mejorar las rutas i -> node1 -> node2 -> j
+        u = self.index[node1]
+        v = self.index[node2]
+        candidate = self.dist[:, u, None] + weight + self.dist[None, v, :]
+        better = candidate < self.dist
+        if better.any():
+            hop = self.nextHop[:, u].copy()  # Primer salto desde i hacia node1
+            hop[u] = v  # Desde node1 el primer salto es node2
+            self.dist = np.where(better, candidate, self.dist)
+            self.nextHop = np.where(better, hop[:, None], self.nextHop)
+
+    def distance(self, start, goal):
+        # Costo del camino más corto entre dos nodos
+        return self.dist[self.index[start], self.index[goal]]
+
+    def path(self, start, goal):
+        # Reconstruir el camino más corto siguiendo la tabla de siguiente salto (vacío si no hay camino)
+        if goal not in self.index or self.nextHop[self.index[start], self.index[goal]] < 0:
+            return []
+        i = self.index[start]
+        j = self.index[goal]
+        path = [start]
+        while i != j:
+            i = self.nextHop[i, j]
+            path.append(self.nodes[i])
+        return path
+
+class DijkstraEngine():
+    # Motor de rutas por defecto: Dijkstra que se detiene en el primer objetivo que extrae de la cola
+    def __init__(self, graph):
+        self.graph = graph  # Grafo del modelo sobre el que se harán las búsquedas
+        self.searches = 0  # Número de búsquedas realizadas
+        self.expanded = 0  # Número total de nodos expandidos
+
+    def heuristic(self, node, goals):
+        # Dijkstra no usa heurística
+        return 0
+
+    def heuristicTable(self, graph, goals):
+        # Heurística de todos los nodos de un CompactGraph a la vez, indexada por identificador
+        return [0] * len(graph.nodes)
+
+    def updateEdge(self, node1, node2, weight):
+        # Dijkstra no guarda información derivada de los costos del grafo
+        pass
+
+    def search(self, graph, start, targets):
+        # Buscar la ruta de menor costo desde start hasta el objetivo más barato de targets;
+        # devuelve (objetivo, ruta) o (None, []) si ningún objetivo es alcanzable
+        self.searches += 1
+
+        goals = [node for node in targets if node in graph]  # Ignorar objetivos que no existen en el grafo
+        if not goals:
+            return None, []
+        if isinstance(graph, CompactGraph):
+            return self.searchCompact(graph, start, goals)
+        goalSet = set(goals)
+
+        # Distancias conocidas desde el inicio y registro del nodo anterior para reconstruir la ruta
+        distances = {start: 0}
+        previous = {}
+
+        # Cola de prioridad con (costo estimado total, costo desde el inicio, nodo)
+        pq = [(self.heuristic(start, goals), 0, start)]
+
+        while pq:
+            # Obtener el nodo con el menor costo estimado
+            estimate, current_distance, current_node = heapq.heappop(pq)
+
+            # El primer objetivo extraído de la cola es el de menor costo: reconstruir su ruta
+            if current_node in goalSet:
+                target = current_node
+                path = []
+                while current_node in previous:
+                    path.append(current_node)
+                    current_node = previous[current_node]
+                path.append(start)
+                path.reverse()
+                return target, path
+
+            # Si la distancia actual es mayor que la distancia registrada, omitir el procesamiento
+            if current_distance > distances[current_node]:
+                continue
+            self.expanded += 1
+
+            # Relajar cada vecino del nodo actual
+            for neighbor, weight in graph[current_node].items():
+                distance = current_distance + weight
+                if distance < distances.get(neighbor, float('infinity')):
+                    distances[neighbor] = distance
+                    previous[neighbor] = current_node
+                    heapq.heappush(pq, (distance + self.heuristic(neighbor, goals), distance, neighbor))
+
+        return None, []
+
+    def searchCompact(self, graph, start, goals):
+        # Misma búsqueda que search sobre un CompactGraph: distancias y predecesores en listas indexadas por
+        # identificador y vecinos leídos de los arreglos CSR, sin hashear tuplas en el ciclo principal
+        nodes = graph.nodes
+        indptr = graph.indptr
+        indices = graph.indices
+        weights = graph.searchWeights()
+        estimates = self.heuristicTable(graph, goals)
+        infinity = float('infinity')
+
+        source = graph.index[start]
+        goalIds = {graph.index[node] for node in goals}
+        distances = [infinity] * len(nodes)
+        distances[source] = 0
+        previous = [-1] * len(nodes)
+
+        pq = [(estimates[source], 0, source)]
+
+        while pq:
+            estimate, current_distance, current = heapq.heappop(pq)
+
+            # El primer objetivo extraído de la cola es el de menor costo: reconstruir su ruta
+            if current in goalIds:
+                target = nodes[current]
+                path = []
+                while current != source:
+                    path.append(nodes[current])
+                    current = previous[current]
+                path.append(start)
+                path.reverse()
+                return target, path
+
+            if current_distance > distances[current]:
+                continue
+            self.expanded += 1
+
+            for slot in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[slot]
+                distance = current_distance + weights[slot]
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    previous[neighbor] = current
+                    heapq.heappush(pq, (distance + estimates[neighbor], distance, neighbor))
+
+        return None, []
+
+class AStarEngine(DijkstraEngine):
+    # A*: heurística de distancia Manhattan al objetivo más cercano, escalada por el menor costo de arco del grafo;
+    # como cada arco une casillas adyacentes y cuesta al menos ese mínimo, la heurística es admisible y consistente
+    def __init__(self, graph):
+        super().__init__(graph)
+        self.minCost = min((weight for neighbors in graph.values() for weight in neighbors.values()), default=1)
+
+    def heuristic(self, node, goals):
+        return self.minCost * min(abs(node[0] - goal[0]) + abs(node[1] - goal[1]) for goal in goals)
+
+    def heuristicTable(self, graph, goals):
+        # Distancia Manhattan de todos los nodos al objetivo más cercano en una sola operación de NumPy
+        manhattan = np.min([np.abs(graph.xs - goal[0]) + np.abs(graph.ys - goal[1]) for goal in goals], axis=0)
+        return (self.minCost * manhattan).tolist()
+
+    def updateEdge(self, node1, node2, weight):
+        # Mantener el costo mínimo al día para que la heurística siga siendo admisible
+        self.minCost = min(self.minCost, weight)
+
+# Motores de rutas disponibles, seleccionables por modelo con FireRescueModel(..., pathEngine=...)
+PATH_ENGINES = {"dijkstra": DijkstraEngine, "astar": AStarEngine}
+
+class TileEvent(NamedTuple):
+    # Registro inmutable del estado de una casilla afectada por un evento (movimiento, puerta, daño, fuego o POI);
+    # se crea una sola vez y se comparte entre affectedTiles y allTiles
+    pos: Tuple[int, int]  # Posición de la casilla
+    top: int  # Estado de la pared superior
+    left: int  # Estado de la pared izquierda
+    bottom: int  # Estado de la pared inferior
+    right: int  # Estado de la pared derecha
+    isOpen: bool  # Si la pared está abierta
+    topHealth: int  # Salud de la pared superior
+    leftHealth: int  # Salud de la pared izquierda
+    bottomHealth: int  # Salud de la pared inferior
+    rightHealth: int  # Salud de la pared derecha
+    fireStatus: int  # Estado de fuego de la casilla
+    hasPOI: bool  # Si la casilla tiene un Punto de Interés
+    numberOfVictims: int  # Número de víctimas en la casilla
+    firefightersIDs: List[int]  # Lista de IDs de bomberos
+    actions: str  # Cadena de estado para información adicional
+    dx: int  # Cambio en posición x
+    dy: int  # Cambio en posición y
+    damageCounter: int  # Daño de la casa
+    poi: Optional[str]  # POI de la casa
+    savedVictims: int  # Víctimas salvadas
+    deadVictims: int  # Víctimas muertas
+
+class EventLog():
+    # Registro columnar de los eventos de casilla de una partida con codificación delta: cada evento guarda su
+    # posición y solo los campos que cambiaron respecto al evento anterior de la misma casilla
+    FIELDS = TileEvent._fields[1:]  # Campos codificados como delta (la posición se guarda siempre)
+
+    def __init__(self):
+        self.stepAgents = []  # Por paso, pares (id del bot, número de eventos) en el orden original
+        self.xs = []  # Coordenada x de cada evento
+        self.ys = []  # Coordenada y de cada evento
+        self.masks = []  # Máscara de bits de los campos que cambiaron en cada evento
+        self.values = []  # Valores de los campos que cambiaron, uno tras otro en el orden de FIELDS
+        self.lastState = {}  # Último evento de cada casilla, para calcular qué cambió
+
+    @classmethod
+    def fromDictionaryList(cls, dictionaryList):
+        # Codificar el dictionaryList completo de un modelo
+        log = cls()
+        for agentsDictionary in dictionaryList:
+            log.appendStep(agentsDictionary)
+        return log
+
+    @classmethod
+    def fromPayload(cls, payload):
+        # Reconstruir el registro a partir de lo que devuelve toPayload (por ejemplo, leído de un archivo JSON)
+        log = cls()
+        log.stepAgents = [[(bot, count) for bot, count in agents] for agents in payload["steps"]]
+        log.xs = payload["x"]
+        log.ys = payload["y"]
+        log.masks = payload["masks"]
+        log.values = payload["values"]
+        return log
+
+    def appendStep(self, agentsDictionary):
+        # Agregar los eventos de un paso ({id del bot: [TileEvent, ...]})
+        agents = []
+        for bot, events in agentsDictionary.items():
+            agents.append((bot, len(events)))
+            for event in events:
+                self.appendEvent(event)
+        self.stepAgents.append(agents)
+
+    def appendEvent(self, event):
+        previous = self.lastState.get(event.pos)
+        if previous is None:
+            # Primer evento de la casilla: guardar todos los campos
+            mask = (1 << len(self.FIELDS)) - 1
+            self.values.extend(event[1:])
+        else:
+            mask = 0
+            for bit, (value, oldValue) in enumerate(zip(event[1:], previous[1:])):
+                # Comparar también el tipo para no confundir True con 1 al decodificar
+                if value != oldValue or type(value) is not type(oldValue):
+                    mask |= 1 << bit
+                    self.values.append(value)
+
+        self.xs.append(event.pos[0])
+        self.ys.append(event.pos[1])
+        self.masks.append(mask)
+        self.lastState[event.pos] = event
+
+    def toDictionaryList(self):
+        # Decodificar: rehacer cada TileEvent completo aplicando sus cambios sobre el último estado de su casilla,
+        # con la misma forma que model.dictionaryList para que parse_actions reconstruya la vista completa
+        state = {}
+        dictionaryList = []
+        index = 0  # Evento actual
+        valueIndex = 0  # Siguiente valor por leer
+        for agents in self.stepAgents:
+            agentsDictionary = {}
+            for bot, count in agents:
+                events = []
+                for i in range(count):
+                    pos = (self.xs[index], self.ys[index])
+                    fields = state.get(pos, [None] * len(self.FIELDS)).copy()
+                    mask = self.masks[index]
+                    for bit in range(len(self.FIELDS)):
+                        if mask >> bit & 1:
+                            fields[bit] = self.values[valueIndex]
+                            valueIndex += 1
+                    state[pos] = fields
+                    events.append(TileEvent(pos, *fields))
+                    index += 1
+                agentsDictionary[bot] = events
+            dictionaryList.append(agentsDictionary)
+        return dictionaryList
+
+    def toPayload(self):
+        # Columnas listas para serializar en JSON
+        return {
+            "fields": list(self.FIELDS),  # Nombres de los campos en el orden de los bits de las máscaras
+            "steps": self.stepAgents,
+            "x": self.xs,
+            "y": self.ys,
+            "masks": self.masks,
+            "values": self.values
+        }
+
+class FireRescueBase():
+    # Métodos comunes al FireRescueModel de FlashPointIntelligent y de FlashPointRandom: índice de casillas, registro
+    # de eventos, propagación del fuego y paso del modelo. Cada variante lo hereda junto con mesa.Model y aporta sus
+    # bomberos, su setEdgeWeight y el resto de las reglas
+    # Direcciones de propagación del fuego en el orden de la regla original: (dx, dy, lado de la pared, lado de la puerta)
+    SPREAD_DIRECTIONS = ((1, 0, "bottom", 3), (-1, 0, "top", 1), (0, -1, "left", 2), (0, 1, "right", 4))
+
+    def createTile(self, pos, top, left, bottom, right, isDoor, isOpen=False):
+        # Crear una casilla normal o, si el modelo usa el estado en arreglos, una vista sobre el BoardState
+        if self.state is not None:
+            return ArrayTile(self.state, pos, top, left, bottom, right, isDoor, isOpen)
+        return Tile(pos, top, left, bottom, right, isDoor, isOpen)
+
+    def insideBuilding(self, pos):
+        # Verificar si la posición es una casilla del edificio según las dimensiones reales de la cuadrícula
+        return 1 <= pos[0] <= self.grid.width - 2 and 1 <= pos[1] <= self.grid.height - 2
+
+    def updateWallEdge(self, node1, node2, destroyed):
+        # Rutina central para reflejar el daño de una pared en el grafo de rutas: el arco node1 -> node2 cuesta 1
+        # si la pared quedó destruida y 3 si solo está dañada; se ignoran arcos que salen del edificio
+        if self.insideBuilding(node1) and self.insideBuilding(node2):
+            self.setEdgeWeight(node1, node2, 1 if destroyed else 3)
+
+    def tile_at(self, pos):
+        # Obtener la casilla en la posición (x, y) directamente del índice, sin recorrer el contenido de la celda
+        return self.tiles[pos]
+
+    def get_grid_state(self):
+        # Con el estado en arreglos, convertir todo el arreglo de fuego de una sola vez
+        if self.state is not None:
+            fireStatus = self.state.fireStatus.tolist()
+            return {pos: fireStatus[pos[0]][pos[1]] for pos in self.tiles}
+
+        grid_state = {}
+        for i in range(1, self.grid.width-1):
+            for j in range(1, self.grid.height-1):
+                tile = self.tile_at((i, j))
+                grid_state[(i, j)] = tile.fireStatus
+        return grid_state
+
+    def appendAffectedTile(self, tile, stateString, dx, dy):
+        if not self.recordEvents:
+            return  # Modo solo resultado: no se arma ningún registro
+
+        firefightersIDs = []  # Inicializar una lista para almacenar los IDs únicos de los bomberos en la casilla
+        for firefighter in tile.hasFireFighter:
+            firefightersIDs.append(firefighter.unique_id)  # Agregar cada ID único de bombero a la lista
+
+        # Crear un solo registro con el estado de la casilla e información relevante
+        event = TileEvent(tile.pos, tile.wall.top, tile.wall.left, tile.wall.bottom, tile.wall.right, tile.wall.isOpen,
+                          tile.wall.topHealth, tile.wall.leftHealth, tile.wall.bottomHealth, tile.wall.rightHealth,
+                          tile.fireStatus, tile.hasPOI, tile.numberOfVictims, firefightersIDs, stateString, dx, dy,
+                          self.damageCounter, tile.poi, self.savedVictims, self.deadVictims)
+
+        # Compartir el mismo registro entre la lista affectedTiles y la lista allTiles
+        self.affectedTiles.append(event)
+        self.allTiles.append(event)
+
+    def step(self):
+        self.affectedTiles = []  # Reiniciar la lista de casillas afectadas para este paso
+
+        if self.recordEvents:
+            self.dictionaryList.append(self.currentAgentsDictionary)  # Agregar el diccionario de agentes actuales a la lista
+            self.currentAgentsDictionary = {}  # Reiniciar el diccionario de agentes actuales
+            self.datacollector.collect(self)
+
+        if self.damageCounter >= self.damageLimit or self.deadVictims >= self.deadVictimLimit:  # Verificar condiciones de pérdida
+            if self.damageCounter >= self.damageLimit:  # Si el daño excede el límite
+                self.demolishedLose += 1  # Aumentar el conteo de pérdidas por demolición
+            elif self.deadVictims >= self.deadVictimLimit:  # Si han muerto demasiadas víctimas
+                self.deadVictimLose += 1  # Aumentar el conteo de pérdidas por víctimas muertas
+            self.running = False  # Establecer running a False para terminar el juego
+            return
+        # Verificar si se ganaron suficientes víctimas
+        elif self.savedVictims >= self.winVictims:  # Verificar si se han salvado suficientes víctimas para ganar
+            self.win += 1  # Aumentar el conteo de victorias
+            self.running = False  # Establecer running a False para terminar el juego
+            return
+        else:
+            self.schedule.step()  # Proceder al siguiente paso en el programador
+
+    def spreadFire(self, x, y):
+        # Pila de trabajo con [x, y, siguiente dirección a revisar]; reproduce el orden de la versión recursiva
+        # (abajo, arriba, izquierda, derecha) sin consumir un marco de la pila de Python por cada casilla encendida
+        stack = []
+        self.visitSpreadTile(x, y, stack)
+
+        while stack:
+            frame = stack[-1]
+            cx, cy, direction = frame
+
+            # Si ya se revisaron las cuatro direcciones, regresar a la casilla anterior
+            if direction == len(self.SPREAD_DIRECTIONS):
+                stack.pop()
+                continue
+            frame[2] += 1
+
+            dx, dy, side, door = self.SPREAD_DIRECTIONS[direction]
+            nx, ny = cx + dx, cy + dy
+
+            # Asegurar que se mantenga dentro de los límites
+            if nx < 1 or ny < 1 or nx > self.grid.width - 2 or ny > self.grid.height - 2:
+                continue
+
+            wall = self.tile_at((cx, cy)).wall
+            next_tile = self.tile_at((nx, ny))
+
+            # Verificar si la casilla vecina tiene humo y si no hay pared o puerta impidiendo la propagación del fuego
+            if next_tile.fireStatus == 1 and (getattr(wall, side) == 0 or (wall.isDoor == door and (wall.isOpen or getattr(wall, side + "Health") <= 0))):
+                next_tile.fireStatus = 2  # Establecer el estado de fuego de la casilla vecina
+                self.visitSpreadTile(nx, ny, stack)  # Continuar la propagación desde la casilla vecina
+
+    def visitSpreadTile(self, x, y, stack):
+        # Obtener la casilla en la posición (x, y)
+        current_tile = self.tile_at((x, y))
+
+        # Si la casilla en llamas tiene un Punto de Interés (POI), revelarlo y matar la víctima si está presente
+        self.revealPOI(current_tile)
+        self.appendAffectedTile(current_tile,"stand", 0, 0)
+
+        self.affectedTiles = []  # Inicializar la lista de casillas afectadas
+        # Solo propagar desde la casilla si su fireStatus no es 0 (no extinguido)
+        if current_tile.fireStatus != 0:
+            stack.append([x, y, 0])
+
+# Número de bomberos de una partida normal
+FIREFIGHTERS = 6
+
+def boardSize(walls):
+    # Dimensiones de la cuadrícula (filas y columnas de casillas más el borde exterior) de un tablero leído con
+    # process_file o generado, en el orden (width, height) en que las recibe FireRescueModel
+    return len(walls) + 2, len(walls[0]) + 2
+
+def generateOpenMap(rows, cols):
+    # Generar un mapa sintético de rows x cols casillas sin paredes interiores (solo el contorno del edificio),
+    # en el mismo formato que devuelve process_file, para pruebas de rendimiento en tableros grandes
+    walls = []
+    for x in range(1, rows + 1):
+        row = []
+        for y in range(1, cols + 1):
+            row.append([int(x == 1), int(y == 1), int(x == rows), int(y == cols)])  # Paredes solo en el contorno
+        walls.append(row)
+
+    entryPoints = [(1, 1), (1, cols)]  # Puntos de entrada en las esquinas superiores
+
+    return walls, [], [], [], entryPoints  # Sin POIs, fuegos ni puertas
+
+def generateBuildingMap(rows, cols, roomSize=4):
+    # Generar un mapa sintético de rows x cols dividido en cuartos de roomSize x roomSize, con una puerta
+    # a la mitad de cada pared entre cuartos, para comparar búsquedas de rutas en tableros grandes con paredes
+    walls = []
+    for x in range(1, rows + 1):
+        row = []
+        for y in range(1, cols + 1):
+            top = int(x == 1 or (x - 1) % roomSize == 0)  # Pared en el borde superior de cada cuarto
+            left = int(y == 1 or (y - 1) % roomSize == 0)  # Pared en el borde izquierdo de cada cuarto
+            bottom = int(x == rows or x % roomSize == 0)  # Pared en el borde inferior de cada cuarto
+            right = int(y == cols or y % roomSize == 0)  # Pared en el borde derecho de cada cuarto
+            row.append([top, left, bottom, right])
+        walls.append(row)
+
+    doors = []
+    middle = roomSize // 2 + 1  # Posición de la puerta dentro de cada pared entre cuartos
+    for x in range(roomSize, rows, roomSize):
+        for y in range(middle, cols + 1, roomSize):
+            doors.append([x, y, x + 1, y])  # Puerta entre un cuarto y el de abajo
+    for y in range(roomSize, cols, roomSize):
+        for x in range(middle, rows + 1, roomSize):
+            doors.append([x, y, x, y + 1])  # Puerta entre un cuarto y el de la derecha
+
+    entryPoints = [(1, middle), (rows, cols - middle + 1)]  # Puntos de entrada en esquinas opuestas
+
+    return walls, [], [], doors, entryPoints  # Sin POIs ni fuegos
+
+# Establecer el nombre del archivo para los datos de entrada
+filename = "input.txt"
+boards = {}  # process_file de cada variante -> paredes, POIs, fuegos, puertas y puntos de entrada de filename
+
+def loadBoard(parse):
+    # Procesar el archivo con parse (el process_file de la variante) una sola vez para obtener paredes, POIs,
+    # fuegos, puertas y puntos de entrada
+    if parse not in boards:
+        boards[parse] = parse(filename)
+    return boards[parse]
+
+def runBatch(variant, games=50, seed=None):
+    # Simular varias partidas seguidas y devolver una fila de resultados por partida; con seed, la partida i usa seed + i
+    walls, POIS, fires, doors, entryPoints = loadBoard(variant.process_file)
+    results = []
+    for i in range(games):
+        model1 = variant.FireRescueModel(FIREFIGHTERS, *boardSize(walls), entryPoints, walls, doors, fires, POIS,
+                                 seed=None if seed is None else seed + i, recordEvents=False)
+        while model1.running:
+            model1.step()
+
+        # Determinar el resultado
+        if model1.win == 1:
+            outcome = "Ganaste"
+        elif model1.demolishedLose == 1:
+            outcome = "Edificio Destruido"
+        elif model1.deadVictimLose == 1:
+            outcome = "Victimas Muertas"
+        else:
+            outcome = "Unknown" # Agregar un resultado por defecto en caso de que no se cumplan las condiciones de victoria/derrota
+
+        # Almacenar los resultados de esta ejecución
+        results.append({
+            "Run": i + 1,
+            "Daño": model1.damageCounter,
+            "Victimas Salvadas": model1.savedVictims,
+            "Victimas Muertas": model1.deadVictims,
+            "Estatus": outcome
+        })
+    return results
+
+# Función para analizar detalles de acción de los datos de entrada
+def parse_actions(x):
+    return {
+        "x": x.pos[0],  # coordenada x de la casilla
+        "y": x.pos[1],  # coordenada y de la casilla
+        "top": x.top,  # Estado de pared superior
+        "left": x.left,  # Estado de pared izquierda
+        "bottom": x.bottom,  # Estado de pared inferior
+        "right": x.right,  # Estado de pared derecha
+        "isOpen": x.isOpen,  # Estado abierto/cerrado de puerta
+        "topHealth": x.topHealth,  # Salud de pared superior
+        "leftHealth": x.leftHealth,  # Salud de pared izquierda
+        "bottomHealth": x.bottomHealth,  # Salud de pared inferior
+        "rightHealth": x.rightHealth,  # Salud de pared derecha
+        "fireStatus": x.fireStatus,  # Estado de fuego en la casilla
+        "hasPOI": x.hasPOI,  # Si la casilla tiene un Punto de Interés (POI)
+        "numberOfVictims": x.numberOfVictims,  # Número de víctimas en la casilla
+        "firefightersIDs": x.firefightersIDs,  # Lista de bomberos presentes en la casilla
+        "actions": x.actions,  # Acciones realizadas en la casilla
+        "dx": x.dx,  # Cambio en coordenada x
+        "dy": x.dy  # Cambio en coordenada y
+    }
+
+def writePendingActions(out, dictionaryList, parse, indent=None, runs=None, fromStep=0, toStep=None):
+    # Escribir las acciones pendientes (run -> bot -> paso) en out (archivo o socket con write(str)) registro por
+    # registro, sin armar antes todo el diccionario ni el texto JSON en memoria; compacto por defecto y con
+    # indent produce exactamente el mismo texto que json.dumps(pending_actions, indent=indent).
+    # runs limita la salida a esos índices de run y fromStep/toStep a los pasos [fromStep, toStep) de cada bot
+    itemSeparator, keySeparator = (",", ":") if indent is None else (",", ": ")
+
+    def newline(level):
+        # Salto de línea con la sangría del nivel (nada en modo compacto)
+        return "" if indent is None else "\n" + " " * (indent * level)
+
+    def dump(value, level):
+        # Serializar un registro pequeño con la sangría que le corresponde dentro del documento
+        text = json.dumps(value, indent=indent, separators=(itemSeparator, keySeparator))
+        return text if indent is None else text.replace("\n", newline(level))
+
+    if runs is None:
+        runs = range(len(dictionaryList))
+
+    out.write("{")
+    for n, k in enumerate(runs):
+        agentsDictionary = dictionaryList[k]
+        if n > 0:
+            out.write(itemSeparator)
+        out.write(newline(1) + json.dumps(f"run_{k}") + keySeparator + "[")
+
+        for b, (xx, xy) in enumerate(agentsDictionary.items()):
+            xy = xy[fromStep:toStep]
+            if b > 0:
+                out.write(itemSeparator)
+            out.write(newline(2) + "{" + newline(3) + '"bot_id"' + keySeparator + dump(xx, 3) + itemSeparator +
+                      newline(3) + '"agent_step_data"' + keySeparator + "[")
+
+            for yy, y in enumerate(xy, fromStep):
+                if yy > fromStep:
+                    out.write(itemSeparator)
+                out.write(newline(4) + dump({
+                    "model_step_id": yy,  # ID del paso del modelo
+                    "affected_tiles_data": parse(y)  # Datos analizados de casillas afectadas
+                }, 4))
+
+            out.write((newline(3) if xy else "") + "]" + newline(2) + "}")
+
+        out.write((newline(1) if agentsDictionary else "") + "]")
+    out.write((newline(0) if runs else "") + "}")
+
+# Formato binario de repeticiones: encabezado, tabla de cadenas (acciones y tipos de POI), y por cada paso sus bots
+# con registros de ancho fijo; los IDs de bomberos de cada registro van justo después como enteros de 32 bits
+REPLAY_MAGIC = b"FPR1"
+REPLAY_COUNT = struct.Struct("<I")  # Número de pasos, bots o eventos
+REPLAY_BOT = struct.Struct("<iI")  # ID del bot y número de eventos
+REPLAY_RECORD = struct.Struct("<HHbbbb?hhhhb?HBhhHBHHB")  # Campos de TileEvent (las cadenas como índice en la tabla)
+REPLAY_NONE = 255  # Índice que representa None en la tabla de cadenas
+
+def encodeBinaryReplay(dictionaryList):
+    # Codificar model.dictionaryList completo (todos los campos de TileEvent) al formato binario
+    strings = []  # Tabla de cadenas, en orden de aparición
+    for agentsDictionary in dictionaryList:
+        for events in agentsDictionary.values():
+            for event in events:
+                for value in (event.actions, event.poi):
+                    if value is not None and value not in strings:
+                        strings.append(value)
+    stringIndex = {value: i for i, value in enumerate(strings)}
+    stringIndex[None] = REPLAY_NONE
+
+    chunks = [REPLAY_MAGIC, bytes([len(strings)])]
+    for value in strings:
+        encoded = value.encode("utf-8")
+        chunks.append(bytes([len(encoded)]) + encoded)
+
+    chunks.append(REPLAY_COUNT.pack(len(dictionaryList)))
+    for agentsDictionary in dictionaryList:
+        chunks.append(REPLAY_COUNT.pack(len(agentsDictionary)))
+        for bot, events in agentsDictionary.items():
+            chunks.append(REPLAY_BOT.pack(bot, len(events)))
+            for event in events:
+                chunks.append(REPLAY_RECORD.pack(event.pos[0], event.pos[1], event.top, event.left, event.bottom, event.right,
+                                                 event.isOpen, event.topHealth, event.leftHealth, event.bottomHealth,
+                                                 event.rightHealth, event.fireStatus, event.hasPOI, event.numberOfVictims,
+                                                 stringIndex[event.actions], event.dx, event.dy, event.damageCounter,
+                                                 stringIndex[event.poi], event.savedVictims, event.deadVictims,
+                                                 len(event.firefightersIDs)))
+                chunks.append(struct.pack(f"<{len(event.firefightersIDs)}i", *event.firefightersIDs))
+
+    return b"".join(chunks)
+
+def decodeBinaryReplay(data):
+    # Decodificar el formato binario de vuelta a la forma de model.dictionaryList
+    if data[:len(REPLAY_MAGIC)] != REPLAY_MAGIC:
+        raise ValueError("No es una repetición binaria de Flash Point")
+    offset = len(REPLAY_MAGIC)
+
+    strings = []
+    for i in range(data[offset]):
+        length = data[offset + 1]
+        strings.append(data[offset + 2:offset + 2 + length].decode("utf-8"))
+        offset += 1 + length
+    offset += 1
+
+    def string(index):
+        return None if index == REPLAY_NONE else strings[index]
+
+    dictionaryList = []
+    (steps,) = REPLAY_COUNT.unpack_from(data, offset)
+    offset += REPLAY_COUNT.size
+    for i in range(steps):
+        agentsDictionary = {}
+        (bots,) = REPLAY_COUNT.unpack_from(data, offset)
+        offset += REPLAY_COUNT.size
+        for j in range(bots):
+            bot, count = REPLAY_BOT.unpack_from(data, offset)
+            offset += REPLAY_BOT.size
+            events = []
+            for k in range(count):
+                (x, y, top, left, bottom, right, isOpen, topHealth, leftHealth, bottomHealth, rightHealth, fireStatus,
+                 hasPOI, numberOfVictims, actions, dx, dy, damageCounter, poi, savedVictims, deadVictims,
+                 firefighters) = REPLAY_RECORD.unpack_from(data, offset)
+                offset += REPLAY_RECORD.size
+                firefightersIDs = list(struct.unpack_from(f"<{firefighters}i", data, offset))
+                offset += 4 * firefighters
+                events.append(TileEvent((x, y), top, left, bottom, right, isOpen, topHealth, leftHealth, bottomHealth,
+                                        rightHealth, fireStatus, hasPOI, numberOfVictims, firefightersIDs, string(actions),
+                                        dx, dy, damageCounter, string(poi), savedVictims, deadVictims))
+            agentsDictionary[bot] = events
+        dictionaryList.append(agentsDictionary)
+
+    return dictionaryList
+
+def replayDigest(game):
+    # Huella del registro de eventos completo de una partida: diccionario inicial más la repetición binaria
+    digest = hashlib.sha256(json.dumps({f"{k[0]},{k[1]}": v for k, v in game.initialDictionary.items()}).encode("utf-8"))
+    digest.update(encodeBinaryReplay(game.dictionaryList))
+    return digest.hexdigest()
+
+def verifyReplay(variant, seed, runs=2):
+    # Volver a jugar la misma semilla varias veces y exigir registros de eventos idénticos byte por byte
+    digests = [replayDigest(variant.simulate(seed)) for i in range(runs)]
+    assert len(set(digests)) == 1, f"La semilla {seed} no reproduce la misma partida: {digests}"
+    return digests[0]
+
+def exportGame(variant, path='bomber_game.json', game=None):
+    # Escribir las acciones pendientes de una partida (una nueva si no se da) al archivo en formato JSON compacto,
+    # registro por registro
+    game = game if game is not None else variant.simulate()
+    with open(path, 'w') as file:
+        writePendingActions(file, game.dictionaryList, parse_actions)
+    return game
+
+def benchmarkTileIndex(variant, walls, POIS, fires, doors, entryPoints, games=200, seed=0):
+    # Micro-benchmark: comparar el tiempo por paso usando el índice de casillas (tile_at)
+    # contra la búsqueda anterior que recorría el contenido de la celda en cada llamada
+    timesPerStep = {}
+
+    for mode in ["escaneo", "indice"]:
+        totalTime = 0
+        totalSteps = 0
+
+        for i in range(games):
+            # La partida i usa la semilla seed + i en los dos modos, así ambos juegan las mismas partidas
+            model2 = variant.FireRescueModel(FIREFIGHTERS, *boardSize(walls), entryPoints, walls, doors, fires, POIS,
+                                             seed=seed + i)
+            if mode == "escaneo":
+                # Sustituir el índice por la búsqueda original sobre el contenido de la celda
+                model2.tile_at = lambda pos, m=model2: [obj for obj in m.grid.get_cell_list_contents([pos]) if isinstance(obj, Tile)][0]
+
+            start = time.perf_counter()
+            while model2.running:
+                model2.step()
+            totalTime += time.perf_counter() - start
+            totalSteps += model2.steps
+
+        timesPerStep[mode] = totalTime / max(totalSteps, 1)
+
+    # Mostrar el tiempo por paso de cada modo y la aceleración obtenida
+    print(f"Escaneo de celda: {timesPerStep['escaneo'] * 1e6:.1f} us/paso")
+    print(f"Índice de casillas: {timesPerStep['indice'] * 1e6:.1f} us/paso")
+    print(f"Aceleración: {timesPerStep['escaneo'] / timesPerStep['indice']:.2f}x")
+
+    return timesPerStep
+
+def benchmarkSpreadFire(variant, sizes=(32, 64, 128), repeats=3):
+    # Stress benchmark: llenar de humo un edificio abierto de size x size y encender una esquina,
+    # de modo que un solo spreadFire convierta todo el tablero en fuego (la versión recursiva
+    # superaba el límite de recursión de Python a partir de 32x32)
+    results = {}
+
+    for size in sizes:
+        walls2, POIS2, fires2, doors2, entryPoints2 = generateOpenMap(size, size)
+
+        best = float("infinity")
+        for i in range(repeats):
+            model2 = variant.FireRescueModel(0, *boardSize(walls2), entryPoints2, walls2, doors2, fires2, POIS2)
+            for tile in model2.tiles.values():
+                tile.fireStatus = 1  # Llenar el edificio de humo
+            model2.tile_at((1, 1)).fireStatus = 2  # Encender la esquina superior izquierda
+
+            start = time.perf_counter()
+            model2.spreadFire(1, 1)
+            best = min(best, time.perf_counter() - start)
+
+        results[size] = best
+        print(f"{size}x{size}: {best * 1e3:.1f} ms ({size * size / best:.0f} casillas/s)")
+
+    return results
+
+def benchmarkEventMemory(variant, walls, POIS, fires, doors, entryPoints, games=100, seed=0):
+    # Medir con tracemalloc la memoria que retiene y la que llega a ocupar cada partida mientras se juega,
+    # junto con el número de eventos de casilla registrados, para estimar la memoria por evento
+    import tracemalloc
+
+    totalEvents = 0
+    totalRetained = 0
+    totalPeak = 0
+
+    for i in range(games):
+        model2 = variant.FireRescueModel(FIREFIGHTERS, *boardSize(walls), entryPoints, walls, doors, fires, POIS,
+                                         seed=seed + i)
+
+        tracemalloc.start()
+        while model2.running:
+            model2.step()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        totalEvents += sum(len(events) for stepDictionary in model2.dictionaryList for events in stepDictionary.values())
+        totalRetained += retained
+        totalPeak += peak
+
+    print(f"Eventos por partida: {totalEvents / games:.1f}")
+    print(f"Memoria retenida por partida: {totalRetained / games / 1024:.1f} KiB ({totalRetained / max(totalEvents, 1):.0f} B/evento)")
+    print(f"Pico de memoria por partida: {totalPeak / games / 1024:.1f} KiB")
+
+    return totalRetained / games, totalPeak / games, totalEvents / games
+
+def benchmarkEventLog(variant, walls, POIS, fires, doors, entryPoints, games=50, seed=0):
+    # Comparar el tamaño y el tiempo de serialización de las repeticiones con instantáneas completas
+    # (parse_actions por evento, como en bomber_game.json) contra el registro columnar con codificación delta,
+    # y verificar que la decodificación reproduzca exactamente los eventos originales
+    sizes = {"completo": 0, "completo compacto": 0, "delta": 0}
+    times = {"completo": 0, "completo compacto": 0, "delta": 0}
+    identical = True
+
+    for i in range(games):
+        model2 = variant.FireRescueModel(FIREFIGHTERS, *boardSize(walls), entryPoints, walls, doors, fires, POIS,
+                                         seed=seed + i)
+        while model2.running:
+            model2.step()
+
+        start = time.perf_counter()
+        snapshots = [{bot: [parse_actions(event) for event in events] for bot, events in agentsDictionary.items()}
+                     for agentsDictionary in model2.dictionaryList]
+        built = time.perf_counter() - start
+
+        for mode, options in [("completo", {"indent": 4}), ("completo compacto", {"separators": (",", ":")})]:
+            start = time.perf_counter()
+            sizes[mode] += len(json.dumps(snapshots, **options))
+            times[mode] += built + time.perf_counter() - start
+
+        start = time.perf_counter()
+        sizes["delta"] += len(json.dumps(EventLog.fromDictionaryList(model2.dictionaryList).toPayload(), separators=(",", ":")))
+        times["delta"] += time.perf_counter() - start
+
+        # Ida y vuelta por JSON: la decodificación debe dar los mismos eventos
+        payload = json.loads(json.dumps(EventLog.fromDictionaryList(model2.dictionaryList).toPayload()))
+        identical = identical and EventLog.fromPayload(payload).toDictionaryList() == model2.dictionaryList
+
+    for mode in sizes:
+        print(f"{mode}: {sizes[mode] / games / 1024:.1f} KiB/partida, {times[mode] / games * 1e3:.2f} ms/partida "
+              f"({sizes['completo'] / sizes[mode]:.1f}x más pequeño que completo)")
+    print(f"Decodificación idéntica: {identical}")
+
+    return sizes, times
+
+def benchmarkExport(variant, walls, POIS, fires, doors, entryPoints, games=20, seed=0):
+    # Comparar la memoria pico y el tiempo de exportar las acciones de varias partidas juntas armando todo el JSON
+    # en memoria (como antes) contra el escritor en streaming, en modo compacto y con indentación
+    import tracemalloc
+
+    dictionaryList = []
+    for i in range(games):
+        model2 = variant.FireRescueModel(FIREFIGHTERS, *boardSize(walls), entryPoints, walls, doors, fires, POIS,
+                                         seed=seed + i)
+        while model2.running:
+            model2.step()
+        dictionaryList.extend(model2.dictionaryList)
+
+    def inMemory(file):
+        pending = {f"run_{k}": [{"bot_id": xx, "agent_step_data": [{"model_step_id": yy, "affected_tiles_data": parse_actions(y)}
+                                                                   for yy, y in enumerate(xy)]}
+                                for xx, xy in v.items()]
+                   for k, v in enumerate(dictionaryList)}
+        file.write(json.dumps(pending, indent=4))
+
+    modes = [("en memoria", inMemory),
+             ("streaming compacto", lambda file: writePendingActions(file, dictionaryList, parse_actions)),
+             ("streaming indentado", lambda file: writePendingActions(file, dictionaryList, parse_actions, indent=4))]
+
+    results = {}
+    for mode, export in modes:
+        with open(os.devnull, "w") as file:
+            # Medir el tiempo sin tracemalloc, que hace mucho más lenta la ejecución
+            start = time.perf_counter()
+            export(file)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            export(file)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results[mode] = (peak, elapsed)
+        print(f"{mode}: pico {peak / 1024:.1f} KiB, {elapsed * 1e3:.1f} ms ({len(dictionaryList)} pasos)")
+
+    return results
+
+def benchmarkReplayFormats(variant, walls, POIS, fires, doors, entryPoints, games=50, seed=0):
+    # Comparar tamaño y tiempo de codificación de la repetición de movimientos en JSON indentado (lo que se envía
+    # hoy a Unity), JSON compacto y el formato binario, y verificar que el binario se decodifique sin pérdidas
+    sizes = {"json indentado": 0, "json compacto": 0, "binario": 0}
+    times = {"json indentado": 0, "json compacto": 0, "binario": 0}
+    identical = True
+
+    for i in range(games):
+        model2 = variant.FireRescueModel(FIREFIGHTERS, *boardSize(walls), entryPoints, walls, doors, fires, POIS,
+                                         seed=seed + i)
+        while model2.running:
+            model2.step()
+
+        for mode, indent in [("json indentado", 4), ("json compacto", None)]:
+            buffer = io.StringIO()
+            start = time.perf_counter()
+            writePendingActions(buffer, model2.dictionaryList, parse_actions, indent=indent)
+            times[mode] += time.perf_counter() - start
+            sizes[mode] += len(buffer.getvalue().encode("utf-8"))
+
+        start = time.perf_counter()
+        data = encodeBinaryReplay(model2.dictionaryList)
+        times["binario"] += time.perf_counter() - start
+        sizes["binario"] += len(data)
+        identical = identical and decodeBinaryReplay(data) == model2.dictionaryList
+
+    for mode in sizes:
+        print(f"{mode}: {sizes[mode] / games / 1024:.1f} KiB/partida, {times[mode] / games * 1e3:.2f} ms/partida "
+              f"({sizes['json indentado'] / sizes[mode]:.1f}x más pequeño)")
+    print(f"Decodificación binaria idéntica: {identical}")
+
+    return sizes, times
+
+def benchmarkServer(variant, clients=16, requestsPerClient=10, slowClients=1):
+    # Prueba de carga local: varios clientes piden /mapa y /movimientos al mismo tiempo mientras un cliente lento
+    # tarda en terminar su petición; compara la latencia p50/p99 del servidor de un hilo contra el de hilos
+    import http.client
+    import socket
+
+    class QuietServer(Server):
+        def log_message(self, format, *args):
+            pass  # No registrar cada petición durante la prueba
+    QuietServer.variant = variant
+
+    results = {}
+    for name, serverClass in [("HTTPServer", HTTPServer), ("ThreadedServer", ThreadedServer)]:
+        httpd = serverClass(("127.0.0.1", 0), QuietServer)
+        port = httpd.server_address[1]
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+        latencies = []
+        lock = threading.Lock()
+
+        def slowClient():
+            # Enviar la petición en dos partes separadas por medio segundo
+            with socket.create_connection(("127.0.0.1", port)) as sock:
+                sock.sendall(b"POST /mapa HTTP/1.0\r\n")
+                time.sleep(0.5)
+                sock.sendall(b"Content-Length: 0\r\n\r\n")
+                while sock.recv(65536):
+                    pass
+
+        def client():
+            for j in range(requestsPerClient):
+                start = time.perf_counter()
+                connection = http.client.HTTPConnection("127.0.0.1", port)
+                connection.request("POST", "/mapa" if j % 2 == 0 else "/movimientos")
+                connection.getresponse().read()
+                connection.close()
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=slowClient) for i in range(slowClients)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)  # Dejar que los clientes lentos ocupen el servidor primero
+        threads += [threading.Thread(target=client) for i in range(clients)]
+        for thread in threads[slowClients:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        httpd.shutdown()
+        httpd.server_close()
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(0.99 * (len(latencies) - 1))]
+        results[name] = (p50, p99)
+        print(f"{name}: p50 {p50 * 1e3:.1f} ms, p99 {p99 * 1e3:.1f} ms ({len(latencies)} peticiones, {clients} clientes)")
+
+    return results
+
+def benchmarkSimulationPool(variant, games=200, workers=None):
+    # Partidas completas por segundo: en serie (tablero y grafo reconstruidos en cada partida) contra el pool
+    # de procesos que los prepara una sola vez y juega las partidas en paralelo
+    start = time.perf_counter()
+    for i in range(games):
+        initSimulationWorker(variant.__name__, filename)
+        simulateGame(i)
+    serial = games / (time.perf_counter() - start)
+
+    pool = SimulationPool(variant, filename, workers, queueSize=games)
+    try:
+        pool.submit(0).result()  # Esperar a que los procesos estén listos
+        start = time.perf_counter()
+        futures = [pool.submit(i) for i in range(games)]
+        for future in futures:
+            future.result()
+        pooled = games / (time.perf_counter() - start)
+    finally:
+        pool.shutdown()
+
+    print(f"En serie: {serial:.1f} partidas/s")
+    print(f"Pool ({pool.workers} procesos): {pooled:.1f} partidas/s ({pooled / serial:.2f}x)")
+    return serial, pooled
+
+def benchmarkParallelBatch(variant, games=400, workers=None, seed=0):
+    # Partidas por segundo del lote en serie contra el lote paralelo con 1 proceso y con todos los procesos;
+    # también comprueba que el lote paralelo da los mismos resultados que jugarlo en este proceso
+    initSimulationWorker(variant.__name__, filename)
+    start = time.perf_counter()
+    serial = playOutcomes(range(games), seed)
+    rates = {"serie": games / (time.perf_counter() - start)}
+
+    for count in sorted({1, workers or os.cpu_count() or 1}):
+        start = time.perf_counter()
+        outcomes = sorted(parallelBatch(variant, games, count, seed))
+        rates[f"{count} procesos"] = games / (time.perf_counter() - start)
+        assert outcomes == serial, "El lote paralelo no coincide con el lote en serie"
+
+    for name, rate in rates.items():
+        print(f"{name}: {rate:.1f} partidas/s ({rate / rates['serie']:.2f}x)")
+    print(json.dumps(summarizeOutcomes(serial)))
+    return rates
+
+def benchmarkOutcomeMode(variant, games=400, seed=0):
+    # Partidas por segundo con el registro de eventos completo contra el modo solo resultado (recordEvents=False),
+    # comprobando que ambos modos dan el mismo resultado para cada semilla
+    initSimulationWorker(variant.__name__, filename)
+    outcomes = {}
+    rates = {}
+    for recordEvents in (True, False):
+        start = time.perf_counter()
+        outcomes[recordEvents] = playOutcomes(range(games), seed, recordEvents)
+        rates[recordEvents] = games / (time.perf_counter() - start)
+    assert outcomes[True] == outcomes[False], "El modo solo resultado cambió el resultado de alguna partida"
+
+    print(f"Con registro de eventos: {rates[True]:.1f} partidas/s")
+    print(f"Solo resultado: {rates[False]:.1f} partidas/s ({rates[False] / rates[True]:.2f}x), {games} partidas idénticas")
+    return rates
+
+def benchmarkArrayState(variant, walls, POIS, fires, doors, entryPoints, games=30, sizes=(32, 64, 128), repeats=20, seed=0):
+    # Comparar el estado del tablero en objetos (Tile y Wall) contra el estado en arreglos (arrayState=True): tiempo por
+    # paso de partidas con registro de eventos en el tablero del archivo, comprobando que ambos modos registran los
+    # mismos eventos, y tiempo de get_grid_state (el reporter del datacollector en cada paso) en edificios grandes
+    results = {}
+
+    for arrayState in (False, True):
+        totalTime = 0
+        totalSteps = 0
+        logs = []
+        for i in range(games):
+            model2 = variant.FireRescueModel(FIREFIGHTERS, *boardSize(walls), entryPoints, walls, doors, fires, POIS,
+                                             arrayState=arrayState, seed=seed + i)
+            start = time.perf_counter()
+            while model2.running:
+                model2.step()
+            totalTime += time.perf_counter() - start
+            totalSteps += model2.steps
+            logs.append(model2.dictionaryList)
+        results[("partida", arrayState)] = totalTime / max(totalSteps, 1)
+        results[("eventos", arrayState)] = logs
+    assert results.pop(("eventos", False)) == results.pop(("eventos", True)), "arrayState cambió el registro de eventos"
+
+    print(f"Partidas en el tablero del archivo: objetos {results[('partida', False)] * 1e6:.1f} us/paso, "
+          f"arreglos {results[('partida', True)] * 1e6:.1f} us/paso "
+          f"({results[('partida', False)] / results[('partida', True)]:.2f}x), {games} registros idénticos")
+
+    for size in sizes:
+        walls2, POIS2, fires2, doors2, entryPoints2 = generateOpenMap(size, size)
+        for arrayState in (False, True):
+            model2 = variant.FireRescueModel(0, *boardSize(walls2), entryPoints2, walls2, doors2, fires2, POIS2, arrayState=arrayState)
+            start = time.perf_counter()
+            for i in range(repeats):
+                model2.get_grid_state()
+            results[(size, arrayState)] = (time.perf_counter() - start) / repeats
+
+        print(f"get_grid_state {size}x{size}: objetos {results[(size, False)] * 1e3:.2f} ms, "
+              f"arreglos {results[(size, True)] * 1e3:.2f} ms ({results[(size, False)] / results[(size, True)]:.2f}x)")
+
+    return results
+
+def benchmarkPathEngines(variant, walls, POIS, fires, doors, entryPoints, sizes=(32, 64), queries=200, seed=0):
+    # Benchmark de los motores de rutas: resolver las mismas consultas (inicio, objetivos) con Dijkstra y A*,
+    # sobre el grafo de diccionarios y sobre el grafo compacto, en el tablero del archivo y en edificios sintéticos;
+    # mide nodos expandidos y tiempo y verifica que todas las combinaciones encuentren rutas del mismo costo
+    boards = [("archivo", (walls, POIS, fires, doors, entryPoints))]
+    for size in sizes:
+        boards.append((f"{size}x{size}", generateBuildingMap(size, size)))
+
+    results = {}
+    for name, (walls2, POIS2, fires2, doors2, entryPoints2) in boards:
+        model2 = variant.FireRescueModel(0, *boardSize(walls2), entryPoints2, walls2, doors2, fires2, POIS2, compactGraph=False)
+        graphs = {"dict": model2.graph, "compacto": CompactGraph(model2.graph)}
+        nodes = sorted(model2.graph)
+
+        # Consultas aleatorias: un inicio y de 1 a 3 objetivos, como al buscar el POI o la entrada más cercana
+        rng = random.Random(seed)
+        queryList = [(rng.choice(nodes), rng.sample(nodes, rng.randint(1, 3))) for i in range(queries)]
+
+        costs = {}
+        for graphName, graph in graphs.items():
+            for engineName, engineClass in PATH_ENGINES.items():
+                engine = engineClass(graph)
+                start = time.perf_counter()
+                paths = [engine.search(graph, origin, targets)[1] for origin, targets in queryList]
+                elapsed = time.perf_counter() - start
+
+                # Costo total de cada ruta encontrada, para comparar la optimalidad entre motores
+                costs[(graphName, engineName)] = [sum(graph[a][b] for a, b in zip(path, path[1:])) for path in paths]
+                results[(name, graphName, engineName)] = (engine.expanded, elapsed)
+                print(f"{name} {graphName} {engineName}: {engine.expanded / queries:.1f} nodos expandidos/consulta, "
+                      f"{elapsed / queries * 1e6:.1f} us/consulta")
+
+        print(f"{name} costos iguales: {len(set(map(tuple, costs.values()))) == 1}")
+
+    return results
+
+def processContext():
+    # Con fork los procesos heredan el módulo ya cargado en lugar de volver a importarlo
+    return multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+
+def initSimulationWorker(variantName, filename):
+    # Preparar un proceso del pool una sola vez: importar la variante por su nombre (sin fork el proceso no la tiene
+    # cargada), leer el tablero y construir su grafo, que cada partida copia
+    global workerVariant, workerBoard, workerGraph
+    workerVariant = importlib.import_module(variantName)
+    workerBoard = workerVariant.process_file(filename)
+    walls2, POIS2, fires2, doors2, entryPoints2 = workerBoard
+    workerGraph = workerVariant.FireRescueModel(0, *boardSize(walls2), entryPoints2, walls2, doors2, fires2, POIS2).graph
+
+def simulateGame(seed=None):
+    # Jugar una partida completa en un proceso del pool y devolverla ya serializada como JSON compacto
+    # ({"mapa": ..., "movimientos": ..., "resultado": ...}) para que el proceso principal solo la reenvíe
+    walls2, POIS2, fires2, doors2, entryPoints2 = workerBoard
+    model2 = workerVariant.FireRescueModel(FIREFIGHTERS, *boardSize(walls2), entryPoints2, walls2, doors2, fires2, POIS2, graph=workerGraph, seed=seed)
+    model2.createInitialDictionary()
+    while model2.running:
+        model2.step()
+
+    buffer = io.StringIO()
+    buffer.write('{"mapa":' + json.dumps({f"{k[0]},{k[1]}": v for k, v in model2.initialDictionary.items()}, separators=(",", ":")))
+    buffer.write(',"movimientos":')
+    writePendingActions(buffer, model2.dictionaryList, parse_actions)
+    buffer.write(',"resultado":' + json.dumps({
+        "win": model2.win,
+        "demolishedLose": model2.demolishedLose,
+        "deadVictimLose": model2.deadVictimLose,
+        "damageCounter": model2.damageCounter,
+        "savedVictims": model2.savedVictims,
+        "deadVictims": model2.deadVictims,
+        "seed": model2.seed
+    }, separators=(",", ":")) + "}")
+    return buffer.getvalue().encode("utf-8")
+
+class SimulationPool():
+    # Pool de procesos con el tablero y el grafo ya preparados que juegan partidas nuevas bajo demanda;
+    # a lo sumo workers + queueSize partidas pueden estar pendientes, las demás se rechazan (contrapresión)
+    def __init__(self, variant, filename, workers=None, queueSize=None):
+        workers = workers or os.cpu_count() or 1
+        queueSize = workers * 4 if queueSize is None else queueSize
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=processContext(),
+                                                               initializer=initSimulationWorker, initargs=(variant.__name__, filename))
+        self.slots = threading.BoundedSemaphore(workers + queueSize)  # Lugares libres en ejecución o en la cola
+        self.workers = workers
+        self.queueSize = queueSize
+
+        # El executor crea sus procesos con la primera tarea; lanzarlos aquí con tareas vacías y esperarlas hace que
+        # el fork ocurra en el hilo que crea el pool (antes de los hilos del servidor) y que un tablero inválido
+        # falle al arrancar y no en la primera petición
+        for future in [self.executor.submit(os.getpid) for i in range(workers)]:
+            future.result()
+
+    def submit(self, seed=None):
+        # Encolar una partida nueva; devuelve un Future con el JSON de la partida, o None si la cola está llena
+        if not self.slots.acquire(blocking=False):
+            return None
+        try:
+            future = self.executor.submit(simulateGame, seed)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda done: self.slots.release())
+        return future
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+class GameOutcome(NamedTuple):
+    # Resultado compacto de una partida de un lote paralelo
+    run: int  # Número de la partida dentro del lote
+    seed: int  # Semilla con la que se jugó
+    win: int
+    demolishedLose: int
+    deadVictimLose: int
+    damageCounter: int
+    savedVictims: int
+    deadVictims: int
+    steps: int
+
+def playOutcomes(runs, seed, recordEvents=False):
+    # Jugar en un proceso del pool las partidas de runs; la partida i usa la semilla seed + i, así cada resultado
+    # no depende de cuántos procesos haya ni de cómo se repartan las partidas
+    walls2, POIS2, fires2, doors2, entryPoints2 = workerBoard
+    outcomes = []
+    for run in runs:
+        model2 = workerVariant.FireRescueModel(FIREFIGHTERS, *boardSize(walls2), entryPoints2, walls2, doors2, fires2, POIS2, graph=workerGraph, seed=seed + run,
+                                 recordEvents=recordEvents)
+        while model2.running:
+            model2.step()
+        outcomes.append(GameOutcome(run, seed + run, model2.win, model2.demolishedLose, model2.deadVictimLose,
+                                    model2.damageCounter, model2.savedVictims, model2.deadVictims, model2.steps))
+    return outcomes
+
+def parallelBatch(variant, games, workers=None, seed=0, chunkSize=64, skip=()):
+    # Repartir un lote de partidas independientes entre un pool de procesos y entregar sus GameOutcome conforme
+    # terminan (no en orden de partida). Las partidas de skip (por ejemplo, las que ya tiene un ResultSink) no se juegan
+    runs = [run for run in range(games) if run not in skip] if skip else range(games)
+    yield from parallelRuns(variant, runs, playOutcomes, (seed,), workers, chunkSize)
+
+def parallelRuns(variant, runs, play, args, workers=None, chunkSize=64):
+    # Jugar las partidas runs en un pool de procesos llamando play(bloque de runs, *args) en cada proceso, y entregar
+    # sus resultados conforme terminan; solo hay dos bloques por proceso en vuelo, así que la memoria no crece con runs
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=processContext(),
+                                                initializer=initSimulationWorker, initargs=(variant.__name__, filename)) as executor:
+        starts = iter(range(0, len(runs), chunkSize))
+        pending = set()
+
+        def submitNext():
+            first = next(starts, None)
+            if first is not None:
+                pending.add(executor.submit(play, runs[first:first + chunkSize], *args))
+
+        for i in range(workers * 2):
+            submitNext()
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                submitNext()
+                yield from future.result()
+
+def summarizeOutcomes(outcomes):
+    # Acumular un flujo de GameOutcome en totales y promedios sin guardar las partidas
+    games = wins = demolishedLoses = deadVictimsLoses = damage = saved = dead = steps = 0
+    for outcome in outcomes:
+        games += 1
+        wins += outcome.win
+        demolishedLoses += outcome.demolishedLose
+        deadVictimsLoses += outcome.deadVictimLose
+        damage += outcome.damageCounter
+        saved += outcome.savedVictims
+        dead += outcome.deadVictims
+        steps += outcome.steps
+    total = games or 1  # Evitar dividir entre cero en un lote vacío, que reporta 0 partidas y promedios en 0
+    return {
+        "games": games,
+        "winRate": wins / total,
+        "demolishedRate": demolishedLoses / total,
+        "deadVictimsRate": deadVictimsLoses / total,
+        "meanDamage": damage / total,
+        "meanSavedVictims": saved / total,
+        "meanDeadVictims": dead / total,
+        "meanSteps": steps / total
+    }
+
+class ResultSink():
+    # Destino de resultados por partida que se escribe conforme llegan, en lugar de juntarlos en memoria: cada
+    # flushEvery filas se vacía al disco, y al abrir un archivo existente se recuperan las partidas ya escritas
+    # (completedRuns) para reanudar un lote interrumpido sin volver a jugarlas
+    FLUSH_EVERY = 100  # Filas entre flushes si no se da flushEvery
+
+    def __init__(self, path, fields=GameOutcome._fields, flushEvery=None):
+        self.path = path
+        self.fields = list(fields)  # Columnas de cada fila; "run" identifica la partida
+        self.flushEvery = flushEvery or self.FLUSH_EVERY
+        self.unflushed = 0  # Filas escritas desde el último flush
+        self.completedRuns = set()
+        if os.path.exists(path):
+            self.recover()  # Descartar lo que una ejecución interrumpida dejó a medias
+            self.completedRuns = {row["run"] for row in self.records()}
+        self.open()
+
+    def write(self, record):
+        # Escribir una fila (GameOutcome u otro NamedTuple, o un diccionario con las columnas de fields)
+        row = record._asdict() if hasattr(record, "_asdict") else record
+        self.writeRow({field: row[field] for field in self.fields})
+        self.completedRuns.add(row["run"])
+        self.unflushed += 1
+        if self.unflushed >= self.flushEvery:
+            self.flush()
+
+    def flush(self):
+        self.unflushed = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TextResultSink(ResultSink):
+    # Base de los formatos de texto con una fila por línea, que se abren en modo de agregar
+    def recover(self):
+        # Cortar una última línea incompleta (la ejecución terminó a media escritura)
+        with open(self.path, "rb+") as file:
+            data = file.read()
+            file.truncate(data.rfind(b"\n") + 1)
+
+    def open(self):
+        self.file = open(self.path, "a", encoding="utf-8", newline="")
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())  # Que las filas sobrevivan aunque el proceso o el equipo se caigan
+        super().flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+class JsonlSink(TextResultSink):
+    # Un objeto JSON por línea
+    def records(self):
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                yield json.loads(line)
+
+    def writeRow(self, row):
+        self.file.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+class CsvSink(TextResultSink):
+    # CSV con encabezado; los valores se leen de vuelta como int o float cuando se puede
+    def records(self):
+        with open(self.path, encoding="utf-8", newline="") as file:
+            for row in csv.DictReader(file):
+                yield {field: parseCsvValue(value) for field, value in row.items()}
+
+    def open(self):
+        super().open()
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fields, lineterminator="\n")
+        if self.file.tell() == 0:
+            self.writer.writeheader()
+
+    def writeRow(self, row):
+        self.writer.writerow(row)
+
+def parseCsvValue(value):
+    for parse in (int, float):
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+    return value
+
+class ParquetSink(ResultSink):
+    # Directorio de archivos Parquet (requiere pyarrow): cada flush escribe las filas pendientes como un archivo nuevo,
+    # así un lote interrumpido conserva todos los archivos terminados; pyarrow y pandas lo leen como una sola tabla
+    FLUSH_EVERY = 10000
+
+    def recover(self):
+        # Borrar el archivo temporal de un flush que no terminó
+        for name in os.listdir(self.path):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.path, name))
+
+    def records(self):
+        import pyarrow.parquet as pq
+        for name in sorted(os.listdir(self.path)):
+            if name.endswith(".parquet"):
+                yield from pq.read_table(os.path.join(self.path, name)).to_pylist()
+
+    def open(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.rows = []  # Filas que aún no se escriben
+        self.parts = sum(1 for name in os.listdir(self.path) if name.endswith(".parquet"))
+
+    def writeRow(self, row):
+        self.rows.append(row)
+
+    def flush(self):
+        if self.rows:
+            import pyarrow
+            import pyarrow.parquet as pq
+            part = os.path.join(self.path, f"part-{self.parts:05d}.parquet")
+            pq.write_table(pyarrow.Table.from_pylist(self.rows), part + ".tmp")
+            os.replace(part + ".tmp", part)  # El archivo aparece completo o no aparece
+            self.parts += 1
+            self.rows = []
+        super().flush()
+
+# Formatos de resultados disponibles según la extensión del archivo
+RESULT_SINKS = {".jsonl": JsonlSink, ".csv": CsvSink, ".parquet": ParquetSink}
+
+def openResultSink(path, fields=GameOutcome._fields, flushEvery=None):
+    # Abrir (o reanudar) el destino de resultados que corresponde a la extensión de path
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in RESULT_SINKS:
+        raise ValueError(f"Formato de resultados desconocido: {path} (usa {', '.join(RESULT_SINKS)})")
+    return RESULT_SINKS[extension](path, fields, flushEvery)
+
+def sinkBatch(variant, path, games, workers=None, seed=0):
+    # Jugar un lote en paralelo escribiendo cada resultado en path conforme llega; las partidas que el archivo ya
+    # tiene no se vuelven a jugar. Devuelve el resumen de todas las partidas del archivo
+    with openResultSink(path) as sink:
+        for outcome in parallelBatch(variant, games, workers, seed, skip=sink.completedRuns):
+            sink.write(outcome)
+        sink.flush()
+        return summarizeOutcomes(GameOutcome(**row) for row in sink.records())
+
+# Parámetros del juego que se pueden barrer con parameterSweep, con sus valores originales
+SWEEP_DEFAULTS = {"firefighters": FIREFIGHTERS, "damageLimit": 24, "deadVictimLimit": 4, "winVictims": 7,
+                  "truePOIs": 10, "falsePOIs": 5, "energyCap": 8}
+
+def sweepPoints(parameters):
+    # Producto cartesiano de los parámetros, como mesa.batchrunner: un valor solo queda fijo y una lista se barre
+    names = list(parameters)
+    values = [value if isinstance(value, (list, tuple, range)) else [value] for value in parameters.values()]
+    return [dict(zip(names, point)) for point in itertools.product(*values)]
+
+def playSweep(runs, points, seeds, seed):
+    # Jugar en un proceso del pool las partidas de un barrido: la partida r usa el punto points[r // seeds] y la
+    # semilla seed + r % seeds, así todos los puntos se comparan con las mismas semillas
+    walls2, POIS2, fires2, doors2, entryPoints2 = workerBoard
+    rows = []
+    for run in runs:
+        point = points[run // seeds]
+        options = {name: value for name, value in point.items() if name != "firefighters"}
+        model2 = workerVariant.FireRescueModel(point["firefighters"], *boardSize(walls2), entryPoints2, walls2, doors2, fires2, POIS2,
+                                 graph=workerGraph, seed=seed + run % seeds, recordEvents=False, **options)
+        while model2.running:
+            model2.step()
+        outcome = GameOutcome(run, seed + run % seeds, model2.win, model2.demolishedLose, model2.deadVictimLose,
+                              model2.damageCounter, model2.savedVictims, model2.deadVictims, model2.steps)
+        rows.append({**point, **outcome._asdict()})
+    return rows
+
+def parameterSweep(variant, parameters, seeds=100, workers=None, seed=0, path=None):
+    # Jugar seeds partidas por cada combinación de parámetros (los que no se den usan SWEEP_DEFAULTS) en el pool de
+    # procesos y devolver una fila por combinación con sus tasas y promedios. Con path, cada partida se escribe
+    # además en un ResultSink y un barrido interrumpido se reanuda donde quedó
+    unknown = set(parameters) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))} (usa {', '.join(SWEEP_DEFAULTS)})")
+    points = sweepPoints({**SWEEP_DEFAULTS, **parameters})
+    games = len(points) * seeds
+    groups = {}  # Parámetros de cada combinación -> {semilla: GameOutcome}
+
+    def collect(row):
+        groups[sweepKey(row)][row["seed"]] = GameOutcome(*[row[field] for field in GameOutcome._fields])
+
+    def wanted(row):
+        # Si la fila es de una combinación y una semilla de este barrido
+        return sweepKey(row) in groups and seed <= row["seed"] < seed + seeds
+
+    for point in points:
+        groups[sweepKey(point)] = {}
+
+    if path is None:
+        for row in parallelRuns(variant, range(games), playSweep, (points, seeds, seed), workers):
+            collect(row)
+    else:
+        with openResultSink(path, list(SWEEP_DEFAULTS) + list(GameOutcome._fields)) as sink:
+            # Reanudar por (combinación, semilla) y no por número de partida: el archivo puede venir de un barrido con
+            # otros valores, y solo se juegan las partidas de este barrido que aún no tiene
+            for row in sink.records():
+                if wanted(row):
+                    collect(row)
+            runs = [run for run in range(games) if seed + run % seeds not in groups[sweepKey(points[run // seeds])]]
+            for row in parallelRuns(variant, runs, playSweep, (points, seeds, seed), workers):
+                sink.write(row)
+                collect(row)
+            sink.flush()
+
+    return [{**dict(zip(SWEEP_DEFAULTS, key)), **summarizeOutcomes(outcomes.values())} for key, outcomes in sorted(groups.items())]
+
+def sweepKey(row):
+    # Valores de los parámetros del juego de una fila o combinación del barrido, en el orden de SWEEP_DEFAULTS
+    return tuple(row[name] for name in SWEEP_DEFAULTS)
+
+def sweepTables(table, parameters):
+    # Tabla de pandas del barrido y, si se barrieron exactamente dos parámetros, la tabla cruzada de tasa de victoria
+    import pandas as pd
+    frame = pd.DataFrame(table)
+    swept = [name for name, value in parameters.items() if isinstance(value, (list, tuple, range)) and len(value) > 1]
+    if len(swept) == 2:
+        return frame, frame.pivot_table(index=swept[0], columns=swept[1], values="winRate")
+    return frame, None
+
+# TC2008B Modelación de Sistemas Multiagentes con gráficas computacionales
+# Python server to interact with Unity via POST
+# Sergio Ruiz-Loza, Ph.D. March 2021
+
+class Server(BaseHTTPRequestHandler):
+    sessions = OrderedDict()  # Session id -> finished FireRescueModel, oldest first
+    sessions_lock = threading.Lock()  # Guards sessions between request threads
+    max_sessions = 64  # Oldest sessions are dropped beyond this many
+    payloads = {}  # (session id, payload kind) -> (body, gzipped body, ETag), encoded once per game
+    pool = None  # SimulationPool that plays the games requested on /partida (service mode only)
+    model = None  # Game served when no session is given, simulated at startup or on first use
+    variant = None  # Game module (FlashPointIntelligent or FlashPointRandom) whose simulate plays the games
+
+    def _set_response(self, content_type='application/json', headers=None):
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def session_model(self, query, create=False):
+        # Pick the model for this request: ?session=<id> selects a per-session game (created on the map request,
+        # "new" generates the id), no session uses the game simulated at startup; None if the session is unknown
+        session = query.get('session', [None])[0]
+        if session is None:
+            with Server.sessions_lock:
+                if Server.model is None:
+                    Server.model = self.variant.simulate()
+            return None, Server.model
+        if session == 'new' and create:
+            session = uuid.uuid4().hex
+        with Server.sessions_lock:
+            session_model = Server.sessions.get(session)
+            if session_model is not None:
+                Server.sessions.move_to_end(session)
+                return session, session_model
+        if not create:
+            return session, None
+
+        # Simulate the session's game outside the lock so other clients are not blocked
+        session_model = self.variant.simulate()
+
+        with Server.sessions_lock:
+            session_model = Server.sessions.setdefault(session, session_model)
+            Server.sessions.move_to_end(session)
+            while len(Server.sessions) > Server.max_sessions:
+                old_session = Server.sessions.popitem(last=False)[0]
+                for key in [key for key in Server.payloads if key[0] == old_session]:
+                    del Server.payloads[key]  # Drop the cached payloads of the evicted session
+        return session, session_model
+
+    def cached_payload(self, session, kind, build):
+        # Return the (body, gzipped body, ETag) of a payload, encoding and compressing it only the first time
+        key = (session, kind)
+        with Server.sessions_lock:
+            payload = Server.payloads.get(key)
+        if payload is not None:
+            return payload
+
+        body = build()
+        payload = (body, gzip.compress(body), '"' + hashlib.sha1(body).hexdigest() + '"')
+        with Server.sessions_lock:
+            # Only keep it if the session is still alive (or it is the startup game)
+            if session is None or session in Server.sessions:
+                payload = Server.payloads.setdefault(key, payload)
+        return payload
+
+    def accepts_gzip(self):
+        # Parse Accept-Encoding with its q-values: gzip (or x-gzip, or * if gzip is not listed) must have q > 0
+        qualities = {}
+        for coding in self.headers.get('Accept-Encoding', '').split(','):
+            name, *params = [part.strip() for part in coding.split(';')]
+            quality = 1.0
+            for param in params:
+                key, _, value = param.partition('=')
+                if key.strip().lower() == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0  # A malformed q-value does not count as accepting the coding
+            qualities[name.lower()] = quality
+        for name in ('gzip', 'x-gzip', '*'):
+            if name in qualities:
+                return qualities[name] > 0
+        return False
+
+    def send_cached(self, payload, content_type, headers=None):
+        # Answer 304 if the client already has this ETag; otherwise send the cached bytes, gzipped if accepted.
+        # Each encoding is a different representation, so the gzipped one gets its own ETag ("<sha1>-gzip")
+        body, gzipped, etag = payload
+        use_gzip = self.accepts_gzip()
+        if use_gzip:
+            etag = etag[:-1] + '-gzip"'
+        if etag in [tag.strip().removeprefix('W/') for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')  # Clients may keep it but must revalidate with the ETag
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(gzipped if use_gzip else body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(gzipped if use_gzip else body)
+
+    def send_event(self, event, data, event_id=None):
+        # Write one server-sent event and push it to the client right away
+        message = f"event: {event}\n"
+        if event_id is not None:
+            message += f"id: {event_id}\n"
+        message += f"data: {data}\n\n"
+        self.wfile.write(message.encode('utf-8'))
+        self.wfile.flush()
+
+    def stream_simulation(self):
+        # Run a fresh FireRescueModel on request and stream it as server-sent events: first the map ("mapa"),
+        # then every step's affected tiles as soon as the step finishes ("movimientos", same shape as one
+        # /movimientos?run=k page) and finally the outcome ("fin")
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        walls, POIS, fires, doors, entryPoints = loadBoard(self.variant.process_file)
+        live_model = self.variant.FireRescueModel(FIREFIGHTERS, *boardSize(walls), entryPoints, walls, doors, fires, POIS)
+        live_model.createInitialDictionary()
+        try:
+            self.send_event('mapa', json.dumps({f"{k[0]},{k[1]}": v for k, v in live_model.initialDictionary.items()}))
+
+            while live_model.running:
+                live_model.step()
+                if live_model.running:
+                    # The agents' dictionary of the step just played only lands in dictionaryList at the start of the
+                    # next step, so send it now under the index it will have there (run_0 is the empty initial step)
+                    step = len(live_model.dictionaryList)
+                    page = io.StringIO()
+                    writePendingActions(page, {step: live_model.currentAgentsDictionary}, parse_actions, runs=[step])
+                    self.send_event('movimientos', page.getvalue(), step)
+
+            self.send_event('fin', json.dumps({
+                "win": live_model.win,
+                "demolishedLose": live_model.demolishedLose,
+                "deadVictimLose": live_model.deadVictimLose,
+                "damageCounter": live_model.damageCounter,
+                "savedVictims": live_model.savedVictims,
+                "deadVictims": live_model.deadVictims
+            }))
+        except (BrokenPipeError, ConnectionResetError):
+            logging.info("SSE client disconnected")  # The client closed the stream before the game ended
+            return
+        logging.info("SSE SIMULACION")  # Log the action
+
+    def send_map(self, query):
+        # Send the initial tile dictionary; the session id (if any) goes back in the X-Session-Id header
+        session, map_model = self.session_model(query, create=True)
+
+        def build():
+            tiles = map_model.initialDictionary  # Retrieve initial dictionary of tiles
+            # Serialize the tile data into a dictionary with coordinates as keys
+            tiles_serialized = {f"{k[0]},{k[1]}": v for k, v in tiles.items()}
+            return json.dumps(tiles_serialized).encode('utf-8')
+
+        # Send the serialized tile data, encoded once per game
+        self.send_cached(self.cached_payload(session, 'mapa', build), 'application/json',
+                         {'X-Session-Id': session} if session else None)
+        logging.info("JSON MAPA")  # Log the action
+
+    def send_movements(self, query):
+        # Send the movements of the requested game: one page, the binary replay, the delta event log or the whole
+        # JSON replay
+        session, movements_model = self.session_model(query)
+        if movements_model is None:
+            self.send_error(404, f"Session {session} does not exist")
+            return
+
+        if 'run' in query or 'from_step' in query or 'to_step' in query:
+            self.send_movements_page(movements_model, query)
+        elif self.wants_binary(query):
+            # Send the binary replay, encoded once per game
+            payload = self.cached_payload(session, 'binario', lambda: encodeBinaryReplay(movements_model.dictionaryList))
+            self.send_cached(payload, 'application/octet-stream')
+            logging.info("REPLAY BINARIO MOVIMIENTOS")  # Log the action
+        elif query.get('format', [''])[0] == 'delta':
+            # Send the columnar delta-encoded event log (EventLog.toPayload), encoded once per game
+            def build():
+                payload = EventLog.fromDictionaryList(movements_model.dictionaryList).toPayload()
+                return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+            self.send_cached(self.cached_payload(session, 'delta', build), 'application/json')
+            logging.info("JSON DELTA MOVIMIENTOS")  # Log the action
+        else:
+            def build():
+                buffer = io.StringIO()
+                writePendingActions(buffer, movements_model.dictionaryList, parse_actions, indent=4)
+                return buffer.getvalue().encode('utf-8')
+
+            # Send the parsed actions JSON, encoded once per game
+            self.send_cached(self.cached_payload(session, 'movimientos', build), 'application/json')
+            logging.info("JSON MOVIMIENTOS")  # Log the action
+
+    def send_new_game(self, query):
+        # Play a brand-new game on an idle pool worker and send it back (map, movements and outcome in one JSON);
+        # when every worker is busy and the queue is full, answer 503 so the client retries later
+        if Server.pool is None:
+            self.send_error(503, "The simulation service is not running")
+            return
+        try:
+            seed = int(query['seed'][0]) if 'seed' in query else None
+        except ValueError:
+            self.send_error(400, "seed must be an integer")
+            return
+
+        try:
+            future = Server.pool.submit(seed)
+            if future is None:
+                self.send_response(503)
+                self.send_header('Retry-After', '1')
+                self.end_headers()
+                logging.info("PARTIDA RECHAZADA (cola llena)")  # Log the action
+                return
+            body = future.result()
+        except BrokenProcessPool:
+            # A worker died and the pool can no longer run games
+            logging.exception("The simulation pool is broken")
+            self.send_error(503, "The simulation service is unavailable")
+            return
+        except Exception:
+            # The game itself failed inside the worker
+            logging.exception("The simulated game failed")
+            self.send_error(500, "The game could not be simulated")
+            return
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        logging.info("JSON PARTIDA")  # Log the action
+
+    def send_movements_page(self, movements_model, query):
+        # Send one page of the movements: ?run=k selects run_k, ?from_step=a&to_step=b selects the
+        # agent steps [a, b) of every bot; the X-Total-Runs header tells the client how many runs exist
+        try:
+            run = int(query['run'][0]) if 'run' in query else None
+            from_step = int(query.get('from_step', ['0'])[0])
+            to_step = int(query['to_step'][0]) if 'to_step' in query else None
+        except ValueError:
+            self.send_error(400, "run, from_step and to_step must be integers")
+            return
+        if from_step < 0 or (to_step is not None and to_step < from_step):
+            self.send_error(400, "Invalid step range")
+            return
+        if run is not None and not 0 <= run < len(movements_model.dictionaryList):
+            self.send_error(404, f"Run {run} does not exist")
+            return
+
+        runs = range(len(movements_model.dictionaryList)) if run is None else [run]
+        self._set_response(headers={'X-Total-Runs': str(len(movements_model.dictionaryList))})
+        writePendingActions(codecs.getwriter('utf-8')(self.wfile), movements_model.dictionaryList, parse_actions,
+                            runs=runs, fromStep=from_step, toStep=to_step)  # Stream the requested page
+        logging.info(f"JSON MOVIMIENTOS run={run} from_step={from_step} to_step={to_step}")  # Log the action
+
+    def wants_binary(self, query):
+        # The binary replay is negotiated with ?format=binary or an Accept: application/octet-stream header
+        return query.get('format', [''])[0] == 'binary' or 'application/octet-stream' in self.headers.get('Accept', '')
+
+    def route(self):
+        # Explicit routes shared by GET and POST: "/" and "/mapa" send the map, "/movimientos" the movements
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path in ('/', '/mapa'):
+            self.send_map(query)
+        elif url.path == '/movimientos':
+            self.send_movements(query)
+        elif url.path == '/simulacion':
+            self.stream_simulation()
+        elif url.path == '/partida':
+            self.send_new_game(query)
+        else:
+            self.send_error(404, f"Unknown route {url.path}")
+
+    def do_GET(self):
+        self.route()
+
+    # Handle POST requests
+    def do_POST(self):
+        logging.info(f"POST ACEPTADO {self.path}")  # Log the request
+        self.route()
+
+class ThreadedServer(ThreadingHTTPServer):
+    request_queue_size = 128  # Larger listen backlog so bursts of clients are not dropped and retried
+    daemon_threads = True  # Do not wait for open request threads on shutdown
+
+def run(variant, server_class=ThreadedServer, handler_class=Server, port=8585):
+    logging.basicConfig(level=logging.INFO)
+    handler_class.variant = variant  # Game module the handlers play with
+    if Server.model is None:
+        Server.model = variant.simulate()  # Simulate the default game before accepting clients
+    server_address = ('', port)
+    httpd = server_class(server_address, handler_class)
+    logging.info("HTTP puerto 8585\n") # HTTPD is HTTP Daemon!
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:   # CTRL+C stops the server
+        pass
+    httpd.server_close()
+    logging.info("Stopping httpd...\n")
+
+def run_service(variant, port=8585, workers=None):
+    # Service mode: SimulationPool forks its worker processes (and waits for them to load the board) right here,
+    # before the server starts any request thread, then /partida plays its games in them
+    Server.pool = SimulationPool(variant, filename, workers)
+    try:
+        run(variant, port=port)
+    finally:
+        Server.pool.shutdown()
+
+def main(argv, variant):
+    # Comandos: simulate [semilla] | verify semilla [veces] | batch [partidas] [semilla] |
+    # montecarlo [partidas] [procesos] [archivo] | sweep semillas procesos [nombre=v1,v2,...]... [archivo] |
+    # export [archivo] | serve [puerto] | service [puerto] [procesos];
+    # sin comando (o solo con el puerto) se levanta el servidor como antes. variant es el módulo del juego
+    if len(argv) in (2, 3) and argv[1] == "simulate":
+        game = variant.simulate(*[int(arg) for arg in argv[2:]])  # Jugar una partida ([semilla]) y mostrar su resultado
+        print(json.dumps({"win": game.win, "demolishedLose": game.demolishedLose, "deadVictimLose": game.deadVictimLose,
+                          "damageCounter": game.damageCounter, "savedVictims": game.savedVictims,
+                          "deadVictims": game.deadVictims, "seed": game.seed}))
+    elif len(argv) in (3, 4) and argv[1] == "verify":
+        # Repetir una semilla ([veces], 2 por defecto) y comprobar que el registro de eventos es idéntico
+        print(f"Semilla {argv[2]}: repetición idéntica, sha256 {verifyReplay(variant, *[int(arg) for arg in argv[2:]])}")
+    elif 2 <= len(argv) <= 4 and argv[1] == "batch":
+        import pandas as pd
+        print(pd.DataFrame(runBatch(variant, *[int(arg) for arg in argv[2:]])))  # [partidas] [semilla]; resultados en tabla
+    elif len(argv) == 5 and argv[1] == "montecarlo":
+        # Lote paralelo escrito partida por partida en un archivo .jsonl, .csv o .parquet, reanudable
+        print(json.dumps(sinkBatch(variant, argv[4], int(argv[2]), int(argv[3]))))
+    elif 2 <= len(argv) <= 4 and argv[1] == "montecarlo":
+        # Lote paralelo de partidas (1000 por defecto): [partidas] [procesos]; imprime tasas y promedios
+        print(json.dumps(summarizeOutcomes(parallelBatch(variant, *([int(arg) for arg in argv[2:]] or [1000])))))
+    elif len(argv) >= 4 and argv[1] == "sweep":
+        # Barrido de parámetros: semillas procesos [nombre=v1,v2,...]... [archivo]
+        parameters = {}
+        for arg in argv[4:]:
+            if "=" in arg:
+                name, values = arg.split("=", 1)
+                parameters[name] = [int(value) for value in values.split(",")]
+        path = next((arg for arg in argv[4:] if "=" not in arg), None)
+        table = parameterSweep(variant, parameters, int(argv[2]), int(argv[3]), path=path)
+        frame, pivot = sweepTables(table, parameters)
+        print(frame.to_string(index=False))
+        if pivot is not None:
+            print()
+            print(pivot)
+    elif len(argv) in (2, 3) and argv[1] == "export":
+        exportGame(variant, *argv[2:])  # Escribir una partida nueva en bomber_game.json (o en el archivo dado)
+    elif len(argv) == 3 and argv[1] == "serve":
+        run(variant, port=int(argv[2]))
+    elif len(argv) == 2 and argv[1] == "serve":
+        run(variant)
+    elif len(argv) == 2 and argv[1] == "benchmark":
+        benchmarkTileIndex(variant, *loadBoard(variant.process_file))  # Ejecutar el micro-benchmark del índice de casillas
+    elif len(argv) == 2 and argv[1] == "benchmark-spread":
+        benchmarkSpreadFire(variant)  # Ejecutar el stress benchmark de propagación del fuego
+    elif len(argv) == 2 and argv[1] == "benchmark-paths":
+        benchmarkPathEngines(variant, *loadBoard(variant.process_file))  # Comparar los motores de rutas Dijkstra y A*
+    elif len(argv) == 2 and argv[1] == "benchmark-events":
+        benchmarkEventMemory(variant, *loadBoard(variant.process_file))  # Medir la memoria de los registros de eventos
+    elif len(argv) == 2 and argv[1] == "benchmark-eventlog":
+        benchmarkEventLog(variant, *loadBoard(variant.process_file))  # Comparar repeticiones completas contra el registro delta
+    elif len(argv) == 2 and argv[1] == "benchmark-export":
+        benchmarkExport(variant, *loadBoard(variant.process_file))  # Comparar la exportación en memoria contra la de streaming
+    elif len(argv) == 2 and argv[1] == "benchmark-replay":
+        benchmarkReplayFormats(variant, *loadBoard(variant.process_file))  # Comparar la repetición en JSON contra la binaria
+    elif len(argv) == 2 and argv[1] == "benchmark-server":
+        benchmarkServer(variant)  # Prueba de carga del servidor con y sin hilos
+    elif len(argv) == 2 and argv[1] == "benchmark-pool":
+        benchmarkSimulationPool(variant)
+    elif len(argv) == 2 and argv[1] == "benchmark-batch":
+        benchmarkParallelBatch(variant)  # Comparar el lote en serie contra el lote en paralelo
+    elif len(argv) == 2 and argv[1] == "benchmark-outcome":
+        benchmarkOutcomeMode(variant)  # Comparar partidas con y sin registro de eventos
+    elif len(argv) == 2 and argv[1] == "benchmark-arraystate":
+        benchmarkArrayState(variant, *loadBoard(variant.process_file))  # Comparar el estado en objetos contra el de arreglos
+    elif len(argv) >= 2 and argv[1] == "service":
+        run_service(variant, *[int(arg) for arg in argv[2:4]])  # Servicio de partidas bajo demanda: [puerto] [procesos]
+    elif len(argv) == 2:
+        run(variant, port=int(argv[1]))
+    else:
+        run(variant)
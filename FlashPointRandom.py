@@ -7,35 +7,15 @@ from mesa.space import SingleGrid, MultiGrid
 # Con ''RandomActivation'', hacemos que todos los agentes se activen ''al mismo tiempo''.
 from mesa.time import RandomActivation
 
-# Haremos uso de ''batch_run'' para ejecutar varias simulaciones
-from mesa.batchrunner import batch_run
-
-# seaborn lo usaremos desplegar una gráficas más ''vistosas'' de nuestro modelo
-from functools import partial
-
 # Haremos uso de ''DataCollector'' para obtener información de cada paso de la simulación.
 from mesa.datacollection import DataCollector
 
-# matplotlib lo usaremos crear una animación de cada uno de los pasos del modelo.
-import matplotlib
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-plt.rcParams["animation.html"] = "jshtml"
-matplotlib.rcParams['animation.embed_limit'] = 2**128
-
-# Importamos los siguientes paquetes para el mejor manejo de valores numéricos.
-import numpy as np
-import pandas as pd
-
-# Definimos otros paquetes que vamos a usar para medir el tiempo de ejecución de nuestro algoritmo.
-import time
-import datetime
 import random
+import sys
 
-import heapq
-from typing import List, Tuple, Dict
-
-import json
+# El tablero, los métodos comunes del modelo, el grafo, los lotes, el servidor y los comandos viven en FlashPointEngine
+from FlashPointEngine import (BoardState, CompactGraph, FireRescueBase, FIREFIGHTERS, boardSize, loadBoard,
+                              main)
 
 class FireFighter(Agent):
     def __init__(self, id, model, x, y):
@@ -108,7 +88,7 @@ class FireFighter(Agent):
         if not direcciones_preferidas:
             direcciones_preferidas = direcciones_validas
 
-        return random.choice(direcciones_preferidas)
+        return self.model.random.choice(direcciones_preferidas)
 
     def buscar_objetivo_cercano(self):
         """Buscar POIs o entradas cercanas"""
@@ -178,8 +158,8 @@ class FireFighter(Agent):
 
         # Reiniciar energía al inicio del turno
         self.energy = 4 + self.energy
-        if self.energy > 8:
-            self.energy = 8
+        if self.energy > self.model.energyCap:
+            self.energy = self.model.energyCap
 
         self.canAdvance = True
         movimientos_realizados = 0
@@ -214,8 +194,8 @@ class FireFighter(Agent):
                 self.tiempo_sin_moverse = 0
 
             # Obtener casillas actual y siguiente
-            current_tile = [obj for obj in self.model.grid.get_cell_list_contents([pos_actual]) if isinstance(obj, Tile)][0]
-            next_tile = [obj for obj in self.model.grid.get_cell_list_contents([siguiente_pos]) if isinstance(obj, Tile)][0]
+            current_tile = self.model.tile_at(pos_actual)
+            next_tile = self.model.tile_at(siguiente_pos)
 
             # Evaluar obstáculos usando el grafo
             if siguiente_pos in self.model.graph.get(pos_actual, {}):
@@ -245,30 +225,30 @@ class FireFighter(Agent):
             elif costo == 2:  # Puerta
                 if self.energy >= 1:
                     self.manipulateDoor(True, siguiente_pos)
-                    self.model.graph[pos_actual][siguiente_pos] = 1
-                    self.model.graph[siguiente_pos][pos_actual] = 1
+                    self.model.setEdgeWeight(pos_actual, siguiente_pos, 1)
+                    self.model.setEdgeWeight(siguiente_pos, pos_actual, 1)
                 else:
                     self.canAdvance = False
 
             elif costo == 3:  # Pared dañada
                 if self.energy >= 2:
                     self.damage(False, siguiente_pos)
-                    self.model.graph[pos_actual][siguiente_pos] = 1
-                    self.model.graph[siguiente_pos][pos_actual] = 1
+                    self.model.setEdgeWeight(pos_actual, siguiente_pos, 1)
+                    self.model.setEdgeWeight(siguiente_pos, pos_actual, 1)
                 else:
                     self.canAdvance = False
 
             elif costo == 5:  # Pared completa
                 if self.energy >= 4:
                     self.damage(True, siguiente_pos)
-                    self.model.graph[pos_actual][siguiente_pos] = 1
-                    self.model.graph[siguiente_pos][pos_actual] = 1
+                    self.model.setEdgeWeight(pos_actual, siguiente_pos, 1)
+                    self.model.setEdgeWeight(siguiente_pos, pos_actual, 1)
                 else:
                     self.canAdvance = False
 
             # Verificar si alcanzó un POI
             if self.pos in self.model.POIsPositions:
-                current_tile = [obj for obj in self.model.grid.get_cell_list_contents([self.pos]) if isinstance(obj, Tile)][0]
+                current_tile = self.model.tile_at(self.pos)
                 if current_tile.hasPOI and current_tile.poi == "v":
                     current_tile.hasPOI = False
                     self.model.numOfPOIs -= 1
@@ -292,13 +272,13 @@ class FireFighter(Agent):
         current_position = self.pos
 
         # Obtener la casilla actual
-        current_tile = [obj for obj in self.model.grid.get_cell_list_contents([current_position]) if isinstance(obj, Tile)][0]
+        current_tile = self.model.tile_at(current_position)
 
         # Remover el bombero de la lista de bomberos de la casilla actual
         current_tile.hasFireFighter.remove(self)
 
         # Obtener la siguiente casilla
-        next_tile = [obj for obj in self.model.grid.get_cell_list_contents([next_position]) if isinstance(obj, Tile)][0]
+        next_tile = self.model.tile_at(next_position)
 
         # Agregar el bombero a la lista de bomberos de la siguiente casilla
         next_tile.hasFireFighter.append(self)
@@ -340,10 +320,10 @@ class FireFighter(Agent):
 
     def manipulateDoor(self, status, next_pos): # True para abrir puerta, false para cerrarla
         # Obtener la casilla actual donde está ubicado el agente
-        current_tile = [obj for obj in self.model.grid.get_cell_list_contents([self.pos]) if isinstance(obj, Tile)][0]
+        current_tile = self.model.tile_at(self.pos)
 
         # Obtener la casilla en la dirección de la siguiente posición
-        tile2 = [obj for obj in self.model.grid.get_cell_list_contents([next_pos]) if isinstance(obj, Tile)][0]
+        tile2 = self.model.tile_at(next_pos)
 
         # Establecer el estado de la puerta (abierto/cerrado) tanto para la casilla actual como para la siguiente
         current_tile.wall.isOpen = status
@@ -365,10 +345,10 @@ class FireFighter(Agent):
 
     def extinguish(self, move):
         # Obtener la casilla actual donde está ubicado el agente
-        current_tile = [obj for obj in self.model.grid.get_cell_list_contents([self.pos]) if isinstance(obj, Tile)][0]
+        current_tile = self.model.tile_at(self.pos)
 
         # Obtener la casilla en la dirección del movimiento
-        next_tile = [obj for obj in self.model.grid.get_cell_list_contents([move]) if isinstance(obj, Tile)][0]
+        next_tile = self.model.tile_at(move)
 
         # Establecer el estado de fuego de la siguiente casilla a 0 (extinguido)
         next_tile.fireStatus = 0
@@ -385,14 +365,14 @@ class FireFighter(Agent):
 
     def damage(self, demolish, next_pos):
         # Obtener la casilla actual donde está ubicado el agente
-        current_tile = [obj for obj in self.model.grid.get_cell_list_contents([self.pos]) if isinstance(obj, Tile)][0]
+        current_tile = self.model.tile_at(self.pos)
 
         # Calcular el cambio en posición
         dx = next_pos[0] - self.pos[0]
         dy = next_pos[1] - self.pos[1]
 
         # Obtener la casilla en la dirección de la siguiente posición
-        other_tile = [obj for obj in self.model.grid.get_cell_list_contents([(self.pos[0]+dx, self.pos[1]+dy)]) if isinstance(obj, Tile)][0]
+        other_tile = self.model.tile_at((self.pos[0]+dx, self.pos[1]+dy))
 
         if demolish:
             # Disminuir energía por la acción de demoler
@@ -464,7 +444,7 @@ class FireFighter(Agent):
 
     def carryVictim(self):
         # Obtener la casilla actual donde está ubicado el agente
-        current_tile = [obj for obj in self.model.grid.get_cell_list_contents([self.pos]) if isinstance(obj, Tile)][0]
+        current_tile = self.model.tile_at(self.pos)
 
         # Verificar si hay víctimas para cargar en la casilla actual
         if current_tile.numberOfVictims > 0:
@@ -477,7 +457,7 @@ class FireFighter(Agent):
 
     def dropVictim(self):
         # Obtener la casilla actual donde está ubicado el agente
-        current_tile = [obj for obj in self.model.grid.get_cell_list_contents([self.pos]) if isinstance(obj, Tile)][0]
+        current_tile = self.model.tile_at(self.pos)
 
         # Establecer el estado de carga como False
         self.carrying = False
@@ -489,88 +469,33 @@ class FireFighter(Agent):
         # Agregar la casilla actual como afectada por la acción de soltar la víctima
         self.model.appendAffectedTile(current_tile,"stand", 0, 0)
 
-class Wall():
-    def __init__(self, id, top, left, bottom, right, isDoor=0, isOpen=False):
-        # Asignar un identificador único a la pared
-        self.unique_id = id
-
-        # Establecer las propiedades de la pared para cada lado (arriba, abajo, izquierda, derecha)
-        self.top = top
-        self.bottom = bottom
-        self.left = left
-        self.right = right
-
-        # Especificar si la pared tiene una puerta (0 indica que no hay puerta)
-        self.isDoor = isDoor
-
-        # Booleano que indica si la puerta está actualmente abierta
-        self.isOpen = isOpen
-
-        # Inicializar la salud de las paredes (4 veces el valor de presencia de la pared)
-        self.topHealth = 4 * top
-        self.bottomHealth = 4 * bottom
-        self.leftHealth = 4 * left
-        self.rightHealth = 4 * right
-
-        # Ajustar las propiedades de la pared si hay una puerta presente
-        if self.isDoor != 0:
-            if self.isDoor == 1:  # Puerta en la parte superior
-                self.top = 2  # Cambiar pared superior para representar una puerta
-                self.topHealth = 2  # Establecer salud para la puerta
-            if self.isDoor == 2:  # Puerta en la izquierda
-                self.left = 2  # Cambiar pared izquierda para representar una puerta
-                self.leftHealth = 2  # Establecer salud para la puerta
-            if self.isDoor == 3:  # Puerta en la parte inferior
-                self.bottom = 2  # Cambiar pared inferior para representar una puerta
-                self.bottomHealth = 2  # Establecer salud para la puerta
-            if self.isDoor == 4:  # Puerta en la derecha
-                self.right = 2  # Cambiar pared derecha para representar una puerta
-                self.rightHealth = 2  # Establecer salud para la puerta
-
-class Tile():
-    def __init__(self, id, top, left, bottom, right, isDoor, isOpen=False):
-        # Asignar un identificador único a la casilla
-        self.unique_id = id
-
-        # Inicializar la posición de la casilla (por defecto es None)
-        self.pos = None
-
-        # Crear un objeto Wall para la casilla con las propiedades de pared proporcionadas
-        self.wall = Wall(id, top, left, bottom, right, isDoor, isOpen)
-
-        # Inicializar el estado de fuego de la casilla (0 indica que no hay fuego)
-        self.fireStatus = 0
-
-        # Booleano que indica si la casilla tiene un Punto de Interés (POI)
-        self.hasPOI = False
-
-        # Contador para el número de víctimas presentes en la casilla
-        self.numberOfVictims = 0
-
-        # Lista para contener bomberos asignados a la casilla
-        self.hasFireFighter = []
-
-        # Referencia a un POI (Punto de Interés) asociado con la casilla
-        self.poi = None
-
-class FireRescueModel(Model):
-    def __init__(self, firefighters, width, height, entrypoints, walls, doors, fires, pois):
-        super().__init__()  # Inicializar la clase padre Model
+class FireRescueModel(FireRescueBase, Model):
+    def __init__(self, firefighters, width, height, entrypoints, walls, doors, fires, pois, arrayState=False, compactGraph=True, graph=None, seed=None, recordEvents=True,
+                 damageLimit=24, deadVictimLimit=4, winVictims=7, truePOIs=10, falsePOIs=5, energyCap=8):
+        # Toda decisión aleatoria del modelo y sus agentes usa self.random; sin semilla se elige una nueva, que queda
+        # guardada en self.seed para poder repetir la partida exacta con FireRescueModel(..., seed=self.seed)
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        super().__init__(seed=self.seed)  # Inicializar la clase padre Model con su generador propio
         self.grid = MultiGrid(width, height, torus=False)  # Crear una cuadrícula para el modelo
         self.schedule = RandomActivation(self)  # Crear un horario para los agentes
 
-        self.steps = 0  # Contador para el número de pasos tomados en la simulación
+        # Model lleva self.steps: cuenta cada llamada a step(), incluida la última que termina la partida
         self.entryPoints = entrypoints  # Almacenar los puntos de entrada para los bomberos
         self.damageCounter = 0  # Contador para rastrear el daño
-        self.numOfPOIs = 15  # Número total de Puntos de Interés
-        self.truePOIs = 10  # Número de Puntos de Interés verdaderos
-        self.falsePOIs = 5  # Número de Puntos de Interés falsos
+        self.numOfPOIs = truePOIs + falsePOIs  # Número total de Puntos de Interés
+        self.truePOIs = truePOIs  # Número de Puntos de Interés verdaderos
+        self.falsePOIs = falsePOIs  # Número de Puntos de Interés falsos
+        self.damageLimit = damageLimit  # Daño con el que el edificio se derrumba y se pierde
+        self.deadVictimLimit = deadVictimLimit  # Víctimas muertas con las que se pierde
+        self.winVictims = winVictims  # Víctimas salvadas con las que se gana
+        self.energyCap = energyCap  # Energía máxima que un bombero puede acumular entre turnos
         self.currentPOIS = 0  # Contador para Puntos de Interés actualmente activos
         self.savedVictims = 0  # Contador para víctimas salvadas
         self.deadVictims = 0  # Contador para víctimas muertas
         self.running = True  # Bandera para indicar si la simulación está ejecutándose
         self.POIsPositions = []  # Lista para almacenar las posiciones de los Puntos de Interés
         self.dictionaryList = []  # Lista para almacenar diccionarios relacionados con la simulación
+        self.recordEvents = recordEvents  # Con False solo se juega la partida: sin repetición, dictionaryList ni datacollector
         self.tilesMatrix = {}  # Diccionario para mantener el estado de las casillas
         self.initialDictionary = {}  # Diccionario para condiciones iniciales
         self.currentAgentsDictionary = {}  # Diccionario para los agentes actuales
@@ -581,9 +506,16 @@ class FireRescueModel(Model):
         self.deadVictimLose = 0  # Contador para pérdidas debido a víctimas muertas
         self.affectedTiles = []  # Lista para almacenar casillas afectadas durante la simulación
         self.allTiles = []  # Lista para almacenar todas las casillas
+        self.tiles = {}  # Índice de casillas por posición (x, y) para búsquedas en O(1)
+        self.state = BoardState(width, height) if arrayState else None  # Estado del tablero en arreglos de NumPy (opcional)
 
-        self.graph = self.generateGraph(walls)  # Generar una representación en grafo de las paredes
-        self.graph = self.addDoorArches(self.graph, doors, cost=2)  # Agregar arcos de puertas al grafo con un costo
+        if graph is not None:
+            self.graph = graph.copy()  # Copiar un grafo ya construido para este tablero en lugar de reconstruirlo
+        else:
+            self.graph = self.generateGraph(walls)  # Generar una representación en grafo de las paredes
+            self.graph = self.addDoorArches(self.graph, doors, cost=2)  # Agregar arcos de puertas al grafo con un costo
+            if compactGraph:
+                self.graph = CompactGraph(self.graph)  # Convertir a la representación compacta con índices enteros
 
         # Colocar las casillas (cuadrantes) en la cuadrícula
         for j, row in enumerate(walls):
@@ -592,34 +524,35 @@ class FireRescueModel(Model):
                 for point in entrypoints:
                     if point[0] == j+1 and point[1] == i+1:  # Verificar si el cuadrante colocado tiene un punto de entrada
                         if point[0] == 1:  # Punto de entrada superior
-                            tile = Tile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 1, True)
+                            tile = self.createTile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 1, True)
                             entryPointTile = True
                         elif point[1] == 1:  # Punto de entrada izquierdo
-                            tile = Tile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 2, True)
+                            tile = self.createTile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 2, True)
                             entryPointTile = True
-                        elif point[0] == 6:  # Punto de entrada inferior
-                            tile = Tile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 3, True)
+                        elif point[0] == len(walls):  # Punto de entrada inferior
+                            tile = self.createTile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 3, True)
                             entryPointTile = True
-                        elif point[1] == 8:  # Punto de entrada derecho
-                            tile = Tile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 4, True)
+                        elif point[1] == len(row):  # Punto de entrada derecho
+                            tile = self.createTile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 4, True)
                             entryPointTile = True
 
                 if not entryPointTile:
-                    tile = Tile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 0)  # Crear una casilla normal si no hay punto de entrada
+                    tile = self.createTile((j+1,i+1), wall[0], wall[1], wall[2], wall[3], 0)  # Crear una casilla normal si no hay punto de entrada
 
                 self.grid.place_agent(tile, (j+1, i+1))  # Colocar la casilla en la cuadrícula
+                self.tiles[(j+1, i+1)] = tile  # Registrar la casilla en el índice de casillas
 
         # Colocar fuegos en la cuadrícula
         for fire in fires:
-            tile = [obj for obj in self.grid.get_cell_list_contents([(fire[0], fire[1])]) if isinstance(obj, Tile)][0]
+            tile = self.tile_at((fire[0], fire[1]))
             tile.fireStatus = 2  # Establecer el estado de fuego de la casilla
 
         # Colocar puertas en la cuadrícula
         for door in doors:
             x1, y1, x2, y2 = door
 
-            tile1 = [obj for obj in self.grid.get_cell_list_contents([(x1, y1)]) if isinstance(obj, Tile)][0]
-            tile2 = [obj for obj in self.grid.get_cell_list_contents([(x2, y2)]) if isinstance(obj, Tile)][0]
+            tile1 = self.tile_at((x1, y1))
+            tile2 = self.tile_at((x2, y2))
 
             dx = abs(x1 - x2)  # Calcular distancia horizontal entre casillas de puerta
             dy = abs(y1 - y2)  # Calcular distancia vertical entre casillas de puerta
@@ -660,8 +593,8 @@ class FireRescueModel(Model):
 
         # Colocar bomberos fuera de la casa en los puntos de entrada
         for i in range(firefighters):
-            x, y = random.choice(entryPoints)  # Seleccionar aleatoriamente un punto de entrada
-            tile = [obj for obj in self.grid.get_cell_list_contents([(x, y)]) if isinstance(obj, Tile)][0]
+            x, y = self.random.choice(self.entryPoints)  # Seleccionar aleatoriamente un punto de entrada
+            tile = self.tile_at((x, y))
 
             firefighter = FireFighter(i, self, x, y)  # Crear un agente bombero
             tile.hasFireFighter.append(firefighter)  # Agregar el bombero a la casilla
@@ -671,79 +604,23 @@ class FireRescueModel(Model):
         # Colocar Puntos de Interés (POIs) en la cuadrícula
         for poi in pois:
             x, y, victim = poi  # Desempaquetar los datos del POI
-            tile = [obj for obj in self.grid.get_cell_list_contents([(x, y)]) if isinstance(obj, Tile)][0]
+            tile = self.tile_at((x, y))
             self.spawnPOI(x, y, tile, victim)  # Generar el POI en la cuadrícula
             self.affectedTiles = []  # Reiniciar lista de casillas afectadas
 
         # Inicializar el tilesMatrix con estados de paredes
         for i in range(1, self.grid.width-1):
             for j in range(1, self.grid.height-1):
-                tile = [obj for obj in self.grid.get_cell_list_contents([(i, j)]) if isinstance(obj, Tile)][0]
+                tile = self.tile_at((i, j))
                 self.tilesMatrix[(i, j)] = [tile.wall.top, tile.wall.left, tile.wall.bottom, tile.wall.right]  # Almacenar estados de paredes en la matriz
 
         self.datacollector = DataCollector(
             model_reporters={"Match": lambda m: self.get_grid_state()}
-        )
-
-    def get_grid_state(self):
-        grid_state = {}
-        for i in range(1, self.grid.width-1):
-            for j in range(1, self.grid.height-1):
-                tile = [obj for obj in self.grid.get_cell_list_contents([(i, j)]) if isinstance(obj, Tile)][0]
-                grid_state[(i, j)] = tile.fireStatus
-        return grid_state
-
-    def appendAffectedTile(self, tile, stateString, dx, dy):
-        firefightersIDs = []  # Inicializar una lista para almacenar los IDs únicos de bomberos en la casilla
-        for firefighter in tile.hasFireFighter:
-            firefightersIDs.append(firefighter.unique_id)  # Agregar el ID único de cada bombero a la lista
-
-        # Agregar el estado de la casilla e información relevante a la lista affectedTiles
-        self.affectedTiles.append([tile.pos,  # Posición de la casilla
-                                  tile.wall.top,  # Estado de la pared superior
-                                  tile.wall.left,  # Estado de la pared izquierda
-                                  tile.wall.bottom,  # Estado de la pared inferior
-                                  tile.wall.right,  # Estado de la pared derecha
-                                  tile.wall.isOpen,  # Si la pared está abierta
-                                  tile.wall.topHealth,  # Salud de la pared superior
-                                  tile.wall.leftHealth,  # Salud de la pared izquierda
-                                  tile.wall.bottomHealth,  # Salud de la pared inferior
-                                  tile.wall.rightHealth,  # Salud de la pared derecha
-                                  tile.fireStatus,  # Estado de fuego de la casilla
-                                  tile.hasPOI,  # Si la casilla tiene un Punto de Interés
-                                  tile.numberOfVictims,  # Número de víctimas en la casilla
-                                  firefightersIDs,  # Lista de IDs de bomberos
-                                  stateString,  # Cadena de estado para información adicional
-                                  dx,  # Cambio en posición x
-                                  dy, # Cambio en posición y
-                                  self.damageCounter,  # Daño de la casa
-                                  tile.poi,  # POI de la casa
-                                  self.savedVictims,  # Víctimas salvadas
-                                  self.deadVictims])  # Víctimas muertas
-
-        # Agregar el mismo estado de la casilla e información relevante a la lista allTiles
-        self.allTiles.append([tile.pos,  # Posición de la casilla
-                                  tile.wall.top,  # Estado de la pared superior
-                                  tile.wall.left,  # Estado de la pared izquierda
-                                  tile.wall.bottom,  # Estado de la pared inferior
-                                  tile.wall.right,  # Estado de la pared derecha
-                                  tile.wall.isOpen,  # Si la pared está abierta
-                                  tile.wall.topHealth,  # Salud de la pared superior
-                                  tile.wall.leftHealth,  # Salud de la pared izquierda
-                                  tile.wall.bottomHealth,  # Salud de la pared inferior
-                                  tile.wall.rightHealth,  # Salud de la pared derecha
-                                  tile.fireStatus,  # Estado de fuego de la casilla
-                                  tile.hasPOI,  # Si la casilla tiene un Punto de Interés
-                                  tile.numberOfVictims,  # Número de víctimas en la casilla
-                                  firefightersIDs,  # Lista de IDs de bomberos
-                                  stateString,  # Cadena de estado para información adicional
-                                  dx,  # Cambio en posición x
-                                  dy,  # Cambio en posición y
-                                  self.damageCounter,  # Daño de la casa
-                                  tile.poi,  # POI de la casa
-                                  self.savedVictims,  # Víctimas salvadas
-                                  self.deadVictims])  # Víctimas muertas
+        ) if recordEvents else None
 
+    def setEdgeWeight(self, node1, node2, weight):
+        # Actualizar el costo del arco node1 -> node2 del grafo
+        self.graph[node1][node2] = weight
 
     def revealPOI(self, current_tile):
         # Si la casilla con fuego tiene un Punto de Interés (POI), revelarlo y matar a la víctima si está presente
@@ -771,7 +648,7 @@ class FireRescueModel(Model):
             # Colocar otro POI en una posición aleatoria
             x = self.random.randint(1, self.grid.width - 2)  # Obtener una coordenada x aleatoria
             y = self.random.randint(1, self.grid.height - 2)  # Obtener una coordenada y aleatoria
-            tile = [obj for obj in self.grid.get_cell_list_contents([(x, y)]) if isinstance(obj, Tile)][0]  # Obtener la casilla en la nueva posición
+            tile = self.tile_at((x, y))  # Obtener la casilla en la nueva posición
 
         # Si el POI aterriza en otro POI...
         # disminuir el número de POIs
@@ -779,7 +656,7 @@ class FireRescueModel(Model):
             # Colocar otro POI en una posición aleatoria
             x = self.random.randint(1, self.grid.width - 2)  # Obtener una coordenada x aleatoria
             y = self.random.randint(1, self.grid.height - 2)  # Obtener una coordenada y aleatoria
-            tile = [obj for obj in self.grid.get_cell_list_contents([(x, y)]) if isinstance(obj, Tile)][0]  # Obtener la casilla en la nueva posición
+            tile = self.tile_at((x, y))  # Obtener la casilla en la nueva posición
 
         self.POIsPositions.append(tile.pos)  # Agregar la posición de la casilla a la lista de posiciones de POI
         # Colocar el POI
@@ -806,7 +683,7 @@ class FireRescueModel(Model):
         while self.currentPOIS < 3 and self.numOfPOIs > 0:
             x = self.random.randint(1, self.grid.width - 2)  # Obtener una coordenada x aleatoria dentro de la cuadrícula
             y = self.random.randint(1, self.grid.height - 2)  # Obtener una coordenada y aleatoria dentro de la cuadrícula
-            tile = [obj for obj in self.grid.get_cell_list_contents([(x, y)]) if isinstance(obj, Tile)][0]  # Obtener la casilla en la posición aleatoria
+            tile = self.tile_at((x, y))  # Obtener la casilla en la posición aleatoria
 
             numF = self.falsePOIs  # Obtener el conteo de POIs falsos
             numV = self.truePOIs if self.truePOIs > 0 else 1  # Obtener el conteo de POIs verdaderos, asegurando que sea al menos 1
@@ -825,35 +702,9 @@ class FireRescueModel(Model):
 
         # Imprimir la ubicación de las casillas con .hasPOI
         self.POIsPositions = []  # Inicializar la lista para mantener posiciones de POIs
-        for i in range(self.grid.width - 1):  # Iterar sobre el ancho de la cuadrícula
-            for j in range(self.grid.height - 1):  # Iterar sobre la altura de la cuadrícula
-                for obj in self.grid.get_cell_list_contents([(i, j)]):  # Verificar cada objeto en la celda de la cuadrícula
-                    if isinstance(obj, Tile) and obj.hasPOI:  # Si el objeto es una casilla y tiene un POI
-                        self.POIsPositions.append(obj.pos)  # Agregar la posición de la casilla con POI
-
-
-    def step(self):
-        self.affectedTiles = []  # Reiniciar la lista de casillas afectadas para este paso
-
-        self.dictionaryList.append(self.currentAgentsDictionary)  # Agregar el diccionario de agentes actuales a la lista
-        self.currentAgentsDictionary = {}  # Reiniciar el diccionario de agentes actuales
-        self.datacollector.collect(self)
-
-        if self.damageCounter >= 24 or self.deadVictims >= 4:  # Verificar condiciones de pérdida
-            if self.damageCounter >= 24:  # Si el daño excede el límite
-                self.demolishedLose += 1  # Aumentar el conteo de pérdidas por demolición
-            elif self.deadVictims >= 4:  # Si han muerto demasiadas víctimas
-                self.deadVictimLose += 1  # Aumentar el conteo de pérdidas por víctimas muertas
-            self.running = False  # Establecer running a False para terminar el juego
-            return
-        # Verificar si se ganaron suficientes víctimas
-        elif self.savedVictims >= 7:  # Verificar si se han salvado suficientes víctimas para ganar
-            self.win += 1  # Aumentar el conteo de victorias
-            self.running = False  # Establecer running a False para terminar el juego
-            return
-        else:
-            self.schedule.step()  # Proceder al siguiente paso en el programador
-            self.steps += 1  # Incrementar el conteo de pasos
+        for pos, tile in self.tiles.items():  # Recorrer el índice de casillas en orden de fila y columna
+            if tile.hasPOI:  # Si la casilla tiene un POI
+                self.POIsPositions.append(pos)  # Agregar la posición de la casilla con POI
 
 
     def killFirefighter(self, tile):
@@ -874,7 +725,7 @@ class FireRescueModel(Model):
         y = self.random.randint(1, self.grid.height - 2)
 
         # Obtener la casilla en las coordenadas generadas
-        tile = [obj for obj in self.grid.get_cell_list_contents([(x, y)]) if isinstance(obj, Tile)][0]
+        tile = self.tile_at((x, y))
         if tile.fireStatus == 0:  # Verificar si la casilla no tiene fuego
             tile.fireStatus = 1  # Establecer el estado de fuego a 1 (indicando que el fuego está comenzando)
             self.appendAffectedTile(tile, "stand", 0, 0)  # Agregar la casilla como afectada
@@ -882,28 +733,28 @@ class FireRescueModel(Model):
             self.affectedTiles = []  # Reiniciar la lista de casillas afectadas
             # Verificar la casilla de abajo
             if x + 1 <= self.grid.width - 2:
-                bottom_tile = [obj for obj in self.grid.get_cell_list_contents([(x + 1, y)]) if isinstance(obj, Tile)][0]
+                bottom_tile = self.tile_at((x + 1, y))
                 if bottom_tile.fireStatus == 2 and (tile.wall.bottom == 0 or (tile.wall.isDoor == 3 and tile.wall.isOpen)):
                     tile.fireStatus = 2  # Establecer el estado de fuego a 2 (indicando propagación de fuego)
                     self.spreadFire(x, y)  # Propagar fuego desde la casilla actual
 
              # Verificar la casilla de arriba
             if x - 1 >= 1:
-                top_tile = [obj for obj in self.grid.get_cell_list_contents([(x - 1, y)]) if isinstance(obj, Tile)][0]
+                top_tile = self.tile_at((x - 1, y))
                 if top_tile.fireStatus == 2 and (tile.wall.top == 0 or (tile.wall.isDoor == 1 and tile.wall.isOpen)):
                     tile.fireStatus = 2  # Establecer el estado de fuego a 2
                     self.spreadFire(x, y)  # Propagar fuego
 
             # Verificar la casilla de la izquierda
             if y - 1 >= 1:
-                left_tile = [obj for obj in self.grid.get_cell_list_contents([(x, y - 1)]) if isinstance(obj, Tile)][0]
+                left_tile = self.tile_at((x, y - 1))
                 if left_tile.fireStatus == 2 and (tile.wall.left == 0 or (tile.wall.isDoor == 2 and tile.wall.isOpen)):
                     tile.fireStatus = 2  # Establecer el estado de fuego a 2
                     self.spreadFire(x, y)  # Propagar fuego
 
             # Verificar la casilla de la derecha
             if y + 1 <= self.grid.height - 2:
-                right_tile = [obj for obj in self.grid.get_cell_list_contents([(x, y + 1)]) if isinstance(obj, Tile)][0]
+                right_tile = self.tile_at((x, y + 1))
                 if right_tile.fireStatus == 2 and (tile.wall.right == 0 or (tile.wall.isDoor == 4 and tile.wall.isOpen)):
                     tile.fireStatus = 2  # Establecer el estado de fuego a 2
                     self.spreadFire(x, y)  # Propagar fuego
@@ -932,7 +783,7 @@ class FireRescueModel(Model):
             return
 
         # Obtener la casilla actual en las coordenadas especificadas
-        current_tile = [obj for obj in self.grid.get_cell_list_contents([(x, y)]) if isinstance(obj, Tile)][0]
+        current_tile = self.tile_at((x, y))
 
         # Verificar si hay humo en la casilla actual
         if current_tile.fireStatus == 1 or current_tile.fireStatus == 0:
@@ -961,7 +812,7 @@ class FireRescueModel(Model):
                 # Verificar si no está en el límite superior
                 if x != 1:
                     # Obtener la casilla arriba de la actual
-                    other_tile = [obj for obj in self.grid.get_cell_list_contents([(x+dx, y+dy)]) if isinstance(obj, Tile)][0]
+                    other_tile = self.tile_at((x+dx, y+dy))
                     other_tile.wall.bottomHealth -= 2
                     # Verificar si la salud de la pared es cero o menor
                     if other_tile.wall.bottomHealth <= 0:
@@ -969,11 +820,9 @@ class FireRescueModel(Model):
                         other_tile.wall.bottom = 0
 
                         # Actualizar el grafo para búsqueda de rutas
-                        if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                            self.graph[(x+dx, y+dy)][(x, y)] = 1
+                        self.updateWallEdge((x+dx, y+dy), (x, y), destroyed=True)
                     else:
-                        if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                            self.graph[(x+dx, y+dy)][(x, y)] = 3
+                        self.updateWallEdge((x+dx, y+dy), (x, y), destroyed=False)
 
                     # Marcar la otra casilla como afectada
                     self.appendAffectedTile(other_tile,"stand", 0, 0)
@@ -989,11 +838,9 @@ class FireRescueModel(Model):
                     self.spreadFire(x, y)
 
                     # Actualizar el grafo para búsqueda de rutas
-                    if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                        self.graph[(x, y)][(x+dx, y+dy)] = 1
+                    self.updateWallEdge((x, y), (x+dx, y+dy), destroyed=True)
                 else:
-                    if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                        self.graph[(x, y)][(x+dx, y+dy)] = 3
+                    self.updateWallEdge((x, y), (x+dx, y+dy), destroyed=False)
 
                 # Marcar la casilla actual como afectada
                 self.appendAffectedTile(current_tile,"stand", 0, 0)
@@ -1003,18 +850,16 @@ class FireRescueModel(Model):
                 # Verificar si no está en el límite inferior
                 if x != self.grid.width - 2:
                     # Obtener la casilla debajo de la actual
-                    other_tile = [obj for obj in self.grid.get_cell_list_contents([(x+dx, y+dy)]) if isinstance(obj, Tile)][0]
+                    other_tile = self.tile_at((x+dx, y+dy))
                     other_tile.wall.topHealth -= 2
                     # Verificar si la salud de la pared es cero o menor
                     if other_tile.wall.topHealth <= 0:
                         other_tile.wall.topHealth = 0
                         other_tile.wall.top = 0
                         # Actualizar el grafo para búsqueda de rutas
-                        if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                            self.graph[(x+dx, y+dy)][(x, y)] = 1
+                        self.updateWallEdge((x+dx, y+dy), (x, y), destroyed=True)
                     else:
-                        if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                            self.graph[(x+dx, y+dy)][(x, y)] = 3
+                        self.updateWallEdge((x+dx, y+dy), (x, y), destroyed=False)
 
                     # Marcar la otra casilla como afectada
                     self.appendAffectedTile(other_tile, "stand", 0, 0)
@@ -1028,11 +873,9 @@ class FireRescueModel(Model):
                     # Propagar fuego si la pared es destruida
                     self.spreadFire(x, y)
                     # Actualizar el grafo para búsqueda de rutas
-                    if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                        self.graph[(x, y)][(x+dx, y+dy)] = 1
+                    self.updateWallEdge((x, y), (x+dx, y+dy), destroyed=True)
                 else:
-                    if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                        self.graph[(x, y)][(x+dx, y+dy)] = 3
+                    self.updateWallEdge((x, y), (x+dx, y+dy), destroyed=False)
 
                 # Marcar la otra casilla como afectada
                 self.appendAffectedTile(current_tile,"stand", 0, 0)
@@ -1042,18 +885,16 @@ class FireRescueModel(Model):
                 # Verificar si no está en el límite izquierdo
                 if y != 1:
                     # Obtener la casilla a la izquierda de la actual
-                    other_tile = [obj for obj in self.grid.get_cell_list_contents([(x+dx, y+dy)]) if isinstance(obj, Tile)][0]
+                    other_tile = self.tile_at((x+dx, y+dy))
                     other_tile.wall.rightHealth -= 2
                     # Verificar si la salud de la pared es cero o menor
                     if other_tile.wall.rightHealth <= 0:
                         other_tile.wall.rightHealth = 0
                         other_tile.wall.right = 0
                         # Actualizar el grafo para búsqueda de rutas
-                        if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                            self.graph[(x+dx, y+dy)][(x, y)] = 1
+                        self.updateWallEdge((x+dx, y+dy), (x, y), destroyed=True)
                     else:
-                        if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                            self.graph[(x+dx, y+dy)][(x, y)] = 3
+                        self.updateWallEdge((x+dx, y+dy), (x, y), destroyed=False)
 
                     # Marcar la otra casilla como afectada
                     self.appendAffectedTile(other_tile,"stand", 0, 0)
@@ -1067,11 +908,9 @@ class FireRescueModel(Model):
                     # Propagar fuego si la pared es destruida
                     self.spreadFire(x, y)
                     # Actualizar el grafo para búsqueda de rutas
-                    if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                        self.graph[(x, y)][(x+dx, y+dy)] = 1
+                    self.updateWallEdge((x, y), (x+dx, y+dy), destroyed=True)
                 else:
-                    if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                        self.graph[(x, y)][(x+dx, y+dy)] = 3
+                    self.updateWallEdge((x, y), (x+dx, y+dy), destroyed=False)
 
                 # Marcar la casilla actual como afectada
                 self.appendAffectedTile(current_tile,"stand", 0, 0)
@@ -1081,18 +920,16 @@ class FireRescueModel(Model):
                 # Verificar si no está en el límite derecho
                 if y != self.grid.height - 2:
                     # Obtener la casilla a la derecha de la actual
-                    other_tile = [obj for obj in self.grid.get_cell_list_contents([(x+dx, y+dy)]) if isinstance(obj, Tile)][0]
+                    other_tile = self.tile_at((x+dx, y+dy))
                     other_tile.wall.leftHealth -= 2
                     # Verificar si la salud de la pared es cero o menor
                     if other_tile.wall.leftHealth <= 0:
                         other_tile.wall.leftHealth = 0
                         other_tile.wall.left = 0
                         # Actualizar el grafo para búsqueda de rutas
-                        if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                            self.graph[(x+dx, y+dy)][(x, y)] = 1
+                        self.updateWallEdge((x+dx, y+dy), (x, y), destroyed=True)
                     else:
-                        if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                            self.graph[(x+dx, y+dy)][(x, y)] = 3
+                        self.updateWallEdge((x+dx, y+dy), (x, y), destroyed=False)
 
                     # Marcar la otra casilla como afectada
                     self.appendAffectedTile(other_tile,"stand", 0, 0)
@@ -1106,11 +943,9 @@ class FireRescueModel(Model):
                     # Propagar fuego si la pared es destruida
                     self.spreadFire(x, y)
                     # Actualizar el grafo para búsqueda de rutas
-                    if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                        self.graph[(x, y)][(x+dx, y+dy)] = 1
+                    self.updateWallEdge((x, y), (x+dx, y+dy), destroyed=True)
                 else:
-                    if (x+dx < 6 and x+dx > 0) and (y+dy > 0 and y+dy < 8):
-                        self.graph[(x, y)][(x+dx, y+dy)] = 3
+                    self.updateWallEdge((x, y), (x+dx, y+dy), destroyed=False)
 
                 # Marcar la otra casilla como afectada
                 self.appendAffectedTile(current_tile,"stand", 0, 0)
@@ -1124,7 +959,7 @@ class FireRescueModel(Model):
 
     def makeExplosion(self, x, y):
         # Obtener la casilla actual en la posición (x, y)
-        current_tile = [obj for obj in self.grid.get_cell_list_contents([(x, y)]) if isinstance(obj, Tile)][0]
+        current_tile = self.tile_at((x, y))
 
         # Moverse hacia abajo desde la posición actual
         self.moveDirection(x, y, 1, 0)
@@ -1138,56 +973,6 @@ class FireRescueModel(Model):
         # Moverse hacia la derecha desde la posición actual
         self.moveDirection(x, y, 0, 1)
 
-    def spreadFire(self, x, y):
-        # Obtener la casilla en la posición (x, y)
-        current_tile = [obj for obj in self.grid.get_cell_list_contents([(x, y)]) if isinstance(obj, Tile)][0]
-
-        # Si la casilla en fuego tiene un Punto de Interés (POI), revelarlo y matar a la víctima si está presente
-        self.revealPOI(current_tile)
-        self.appendAffectedTile(current_tile,"stand", 0, 0)
-
-        self.affectedTiles = []  # Inicializar la lista de casillas afectadas
-        # Verificar si el fireStatus de la casilla actual no es 0 (no extinguido)
-        if current_tile.fireStatus != 0:
-            # Verificar y propagar el fuego a casillas adyacentes
-
-            # Moverse hacia abajo a la casilla adyacente inferior
-            if x + 1 <= self.grid.width - 2:  # Asegurar que se mantenga dentro de los límites
-                bottom_tile = [obj for obj in self.grid.get_cell_list_contents([(x + 1, y)]) if isinstance(obj, Tile)][0]
-                # Verificar si la casilla inferior está en fuego y si no hay pared o puerta que evite que el fuego se propague
-                if bottom_tile.fireStatus == 1 and (current_tile.wall.bottom == 0 or (current_tile.wall.isDoor == 3 and (current_tile.wall.isOpen or current_tile.wall.bottomHealth <= 0))):
-                    bottom_tile.fireStatus = 2  # Establecer el estado de fuego de la casilla inferior
-                    # Llamada recursiva para propagar el fuego desde la casilla inferior
-                    self.spreadFire(x + 1, y)
-
-            # Moverse hacia arriba a la casilla adyacente superior
-            if x - 1 >= 1:  # Asegurar que se mantenga dentro de los límites
-                top_tile = [obj for obj in self.grid.get_cell_list_contents([(x - 1, y)]) if isinstance(obj, Tile)][0]
-                # Verificar si la casilla superior está en fuego y si no hay pared o puerta que evite que el fuego se propague
-                if top_tile.fireStatus == 1 and (current_tile.wall.top == 0 or (current_tile.wall.isDoor == 1 and (current_tile.wall.isOpen or current_tile.wall.topHealth <= 0))):
-                    top_tile.fireStatus = 2  # Establecer el estado de fuego de la casilla superior
-                    # Llamada recursiva para propagar el fuego desde la casilla superior
-                    self.spreadFire(x - 1, y)
-
-            # Moverse hacia la izquierda a la casilla adyacente izquierda
-            if y - 1 >= 1:  # Asegurar que se mantenga dentro de los límites
-                left_tile = [obj for obj in self.grid.get_cell_list_contents([(x, y - 1)]) if isinstance(obj, Tile)][0]
-                # Verificar si la casilla izquierda está en fuego y si no hay pared o puerta que evite que el fuego se propague
-                if left_tile.fireStatus == 1 and (current_tile.wall.left == 0 or (current_tile.wall.isDoor == 2 and (current_tile.wall.isOpen or current_tile.wall.leftHealth <= 0))):
-                    left_tile.fireStatus = 2  # Establecer el estado de fuego de la casilla izquierda
-                    # Llamada recursiva para propagar el fuego desde la casilla izquierda
-                    self.spreadFire(x, y - 1)
-
-            # Moverse hacia la derecha a la casilla adyacente derecha
-            if y + 1 <= self.grid.height - 2:  # Asegurar que se mantenga dentro de los límites
-                right_tile = [obj for obj in self.grid.get_cell_list_contents([(x, y + 1)]) if isinstance(obj, Tile)][0]
-
-                # Verificar si la casilla derecha está en fuego y si no hay pared o puerta que evite que el fuego se propague
-                if right_tile.fireStatus == 1 and (current_tile.wall.right == 0 or (current_tile.wall.isDoor == 4 and (current_tile.wall.isOpen or current_tile.wall.rightHealth <= 0))):
-                    right_tile.fireStatus = 2  # Establecer el estado de fuego de la casilla derecha
-                    # Llamada recursiva para propagar el fuego desde la casilla derecha
-                    self.spreadFire(x, y + 1)
-
     def generateGraph(self, matrix):
         # Obtener el número de filas y columnas en la matriz
         rows = len(matrix)
@@ -1255,7 +1040,7 @@ class FireRescueModel(Model):
         for i in range(1, self.grid.width-1):
             for j in range(1, self.grid.height-1):
                 # Obtener la casilla en la posición actual (i, j)
-                tile = [obj for obj in self.grid.get_cell_list_contents([(i, j)]) if isinstance(obj, Tile)][0]
+                tile = self.tile_at((i, j))
                 firefightersIDs = []  # Inicializar una lista para almacenar los IDs únicos de bomberos
 
                 # Iterar a través de los bomberos asignados a la casilla
@@ -1279,12 +1064,6 @@ class FireRescueModel(Model):
                     "numberVictims": tile.numberOfVictims,  # Número de víctimas presentes en la casilla
                     "firefighters": firefightersIDs  # Lista de IDs de bomberos presentes en la casilla
                 }
-# Definir constantes para las dimensiones de la cuadrícula y número de bomberos
-WIDTH = 10
-HEIGHT = 8
-FIREFIGHTERS = 6
-MAX_ITERATIONS = 50
-iteration = 0
 
 def process_file(filename):
     # Abrir el archivo especificado en modo lectura
@@ -1299,10 +1078,13 @@ def process_file(filename):
     doors = []
     entryPoints = []
 
-    # Leer las primeras 6 líneas para construir la estructura de paredes
-    for i in range(6):
+    # Leer las líneas del principio que son filas de paredes (valores binarios de 4 dígitos); su número
+    # determina las filas del tablero
+    for line in lines:
+        binary = line.strip().split()  # Dividir la línea en valores binarios
+        if not binary or any(len(num) != 4 or set(num) - set("01") for num in binary):
+            break
         row = []
-        binary = lines[i].strip().split()  # Dividir la línea en valores binarios
         for num in binary:
             # Convertir la cadena a una lista de enteros que representan propiedades de pared
             wall = [int(num[0]), int(num[1]), int(num[2]), int(num[3])]
@@ -1310,7 +1092,7 @@ def process_file(filename):
         walls.append(row)  # Agregar la fila a la lista de paredes
 
     # Leer las líneas restantes para POIs, fuegos, puertas y puntos de entrada
-    rest = [line.strip().split() for line in lines[6:]]
+    rest = [line.strip().split() for line in lines[len(walls):]]
 
     # Parsear Puntos de Interés (POIs)
     for item in rest:
@@ -1343,226 +1125,19 @@ def process_file(filename):
 
     return walls, POIS, fires, doors, entryPoints  # Retornar los datos parseados
 
-# Establecer el nombre del archivo para los datos de entrada
-filename = "input.txt"
-# Procesar el archivo para obtener paredes, POIs, fuegos, puertas y puntos de entrada
-walls, POIS, fires, doors, entryPoints = process_file(filename)
-
-# Inicializar el Modelo de Rescate contra Incendios con los datos parseados
-model = FireRescueModel(FIREFIGHTERS, HEIGHT, WIDTH, entryPoints, walls, doors, fires, POIS)
-
-# Establecer el diccionario inicial
-model.createInitialDictionary()
-
-# Ejecutar la simulación mientras el modelo esté activo
-while model.running:
-    model.step()  # Realizar un paso en la simulación del modelo
-
-# Función para parsear detalles de acciones desde datos de entrada
-def parse_actions(x):
-    return {
-        "x": x[0][0],  # coordenada x de la casilla
-        "y": x[0][1],  # coordenada y de la casilla
-        "top": x[1],  # Estado de pared superior
-        "left": x[2],  # Estado de pared izquierda
-        "bottom": x[3],  # Estado de pared inferior
-        "right": x[4],  # Estado de pared derecha
-        "isOpen": x[5],  # Estado abierto/cerrado de puerta
-        "topHealth": x[6],  # Salud de pared superior
-        "leftHealth": x[7],  # Salud de pared izquierda
-        "bottomHealth": x[8],  # Salud de pared inferior
-        "rightHealth": x[9],  # Salud de pared derecha
-        "fireStatus": x[10],  # Estado de fuego en la casilla
-        "hasPOI": x[11],  # Si la casilla tiene un Punto de Interés (POI)
-        "numberOfVictims": x[12],  # Número de víctimas en la casilla
-        "firefightersIDs": x[13],  # Lista de bomberos presentes en la casilla
-        "actions": x[14],  # Acciones realizadas en la casilla
-        "dx": x[15],  # Cambio en coordenada x
-        "dy": x[16],  # Cambio en coordenada y
-        "damageCounter": x[17],  # Contador de daño en la casilla
-        "poi": x[18],  # POI en la casilla
-        "savedVictims": x[19],  # Número de víctimas salvadas
-        "deadVictims": x[20]  # Número de víctimas muertas
-    }
-
-# Diccionario para almacenar acciones pendientes
-pending_actions = {}
-
-# Iterar a través de cada elemento en la lista de diccionarios del modelo
-for (k, v) in enumerate(model.dictionaryList):
-
-    n1_acc = []  # Acumulador para almacenar datos de pasos del agente
-    # Iterar a través de cada ID de bot y sus datos asociados
-    for xx, xy in v.items():
-        n2_acc = []  # Acumulador para datos de casillas afectadas
-        # Iterar a través de cada paso del modelo y sus datos
-        for yy, y in enumerate(xy):
-            n2_acc.append({
-                "model_step_id": yy,  # ID del paso del modelo
-                "affected_tiles_data": parse_actions(y)  # Parsear los datos de casilla afectada
-            })
-            n1 = {
-                "bot_id": xx,  # ID del bot
-                "agent_step_data": n2_acc  # Datos de pasos del agente
-            }
-            n1_acc.append(n1)  # Agregar los datos de paso del agente a la lista
-
-    # Almacenar los datos de agente acumulados para la ejecución actual
-    pending_actions[f"run_{k}"] = n1_acc
-
-# Serializar las acciones pendientes a formato JSON con indentación
-parsedJSON = json.dumps(pending_actions, indent=4)
-def parse_actions(x):
-    return {
-        "x": x[0][0],
-        "y": x[0][1],
-        "top": x[1],
-        "left": x[2],
-        "bottom": x[3],
-        "right": x[4],
-        "isOpen": x[5],
-        "topHealth": x[6],
-        "leftHealth": x[7],
-        "bottomHealth": x[8],
-        "rightHealth": x[9],
-        "fireStatus": x[10],
-        "hasPOI": x[11],
-        "numberOfVictims": x[12],
-        "firefightersIDs": x[13],
-        "actions": x[14],
-        "dx": x[15],
-        "dy": x[16]
-    }
-
-# Asumir que model.dictionaryList[1][0][0] son tus datos
-#data = parse_actions(model.dictionaryList[1][0][0])
-
-# Diccionario para almacenar acciones pendientes
-pending_actions = {}
-
-# Iterar a través de cada elemento en la lista de diccionarios del modelo
-for (k, v) in enumerate(model.dictionaryList):
-
-    n1_acc = []  # Acumulador para datos de agentes
-    # Iterar a través de cada ID de bot y sus datos asociados
-    for xx, xy in v.items():
-      n2_acc = []  # Acumulador para datos de pasos del modelo
-      # Iterar a través de cada paso del modelo y sus datos
-      for yy, y in enumerate(xy):
-        n2_acc.append({
-            "model_step_id": yy,  # ID del paso del modelo
-            "affected_tiles_data": parse_actions(y)  # Datos de casillas afectadas parseados
-        })
-
-      n1 = {
-          "bot_id": xx,  # ID del bot
-          "agent_step_data": n2_acc  # Datos de pasos del agente
-      }
-      n1_acc.append(n1)  # Agregar datos del agente al acumulador
-    # Almacenar los datos acumulados para la ejecución actual
-    pending_actions[f"run_{k}"] = n1_acc
-
-# Serializar las acciones pendientes a formato JSON con indentación
-parsedJSON = json.dumps(pending_actions, indent=4)
-
-# Escribir el JSON parseado a un archivo
-with open('bomber_game.json', 'w') as file:
-  file.write(parsedJSON)
-
-# TC2008B Modelación de Sistemas Multiagentes con gráficas computacionales
-# Python server to interact with Unity via POST
-# Sergio Ruiz-Loza, Ph.D. March 2021
-
-from http.server import BaseHTTPRequestHandler, HTTPServer
-import logging
-import json
-
-class Server(BaseHTTPRequestHandler):
-    request_count = 0
-
-    def _set_response(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-
-    def do_GET(self):
-        self._set_response()
-        self.wfile.write("GET request for {}".format(self.path).encode('utf-8'))
-
-    # Handle POST requests
-    def do_POST(self):
-        Server.request_count += 1  # Increment request counter
-        logging.info(f"POST ACEPTADO #{Server.request_count}")  # Log the request
-        tiles = model.initialDictionary  # Retrieve initial dictionary of tiles
-        # Serialize the tile data into a dictionary with coordinates as keys
-        tiles_serialized = {f"{k[0]},{k[1]}": v for k, v in tiles.items()}
-
-        # If it's the first request, send the tile data
-        if Server.request_count == 1:
-            self._set_response()  # Set response headers
-            self.wfile.write(json.dumps(tiles_serialized).encode('utf-8'))  # Send the serialized tile data
-            logging.info("JSON MAPA")  # Log the action
-        else:
-            self._set_response()  # Set response headers
-            self.wfile.write(parsedJSON.encode('utf-8'))  # Send the parsed actions JSON
-            logging.info("JSON MOVIMIENTOS")  # Log the action
-            Server.request_count = 0  # Reset request counter
-
+def simulate(seed=None):
+    # Jugar una partida completa con el tablero de filename y devolver el modelo terminado (seed la hace repetible)
+    walls, POIS, fires, doors, entryPoints = loadBoard(process_file)
+    # Inicializar el Modelo de Rescate contra Incendios con los datos parseados
+    game = FireRescueModel(FIREFIGHTERS, *boardSize(walls), entryPoints, walls, doors, fires, POIS, seed=seed)
 
-def run(server_class=HTTPServer, handler_class=Server, port=8585):
-    logging.basicConfig(level=logging.INFO)
-    server_address = ('', port)
-    httpd = server_class(server_address, handler_class)
-    logging.info("HTTP puerto 8585\n") # HTTPD is HTTP Daemon!
+    # Establecer el diccionario inicial
+    game.createInitialDictionary()
 
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:   # CTRL+C stops the server
-        pass
-    httpd.server_close()
-    logging.info("Stopping httpd...\n")
+    # Ejecutar la simulación mientras el modelo esté activo
+    while game.running:
+        game.step()  # Realizar un paso en la simulación del modelo
+    return game
 
 if __name__ == '__main__':
-    from sys import argv
-
-    if len(argv) == 2:
-        run(port=int(argv[1]))
-    else:
-        run()
-
-deadVictimsLoses = 0
-wins = 0
-demolishedLoses = 0
-damageCounter = []
-savedVictims = []
-deadVictims = []
-results = []
-
-# Simulación de 10 ejecuciones
-for i in range(50):
-    model1 = FireRescueModel(FIREFIGHTERS, HEIGHT, WIDTH, entryPoints, walls, doors, fires, POIS)
-    while model1.running:
-        model1.step()
-
-    # Determinar el resultado
-    if model1.win == 1:
-        outcome = "Win"
-        wins += 1
-    elif model1.demolishedLose == 1:
-        outcome = "Lose - Demolished"
-        demolishedLoses += 1
-    elif model1.deadVictimLose == 1:
-        outcome = "Lose - Dead Victims"
-        deadVictimsLoses += 1
-
-    # Almacenar los resultados de esta ejecución
-    damageCounter.append(model1.damageCounter)
-    savedVictims.append(model1.savedVictims)
-    deadVictims.append(model1.deadVictims)
-    results.append({
-        "Run": i + 1,
-        "Damage Counter": model1.damageCounter,
-        "Saved Victims": model1.savedVictims,
-        "Dead Victims": model1.deadVictims,
-        "Outcome": outcome
-    })
\ No newline at end of file
+    main(sys.argv, sys.modules[__name__])  # Los comandos de FlashPointEngine juegan con este módulo
@@ -0,0 +1,175 @@
+# Pruebas del motor contra mesa real (se omiten si mesa no está instalado); se ejecutan desde la raíz del
+# repositorio con python -m pytest
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+pytest.importorskip("mesa")
+
+import FlashPointEngine
+import FlashPointIntelligent
+import FlashPointRandom
+
+# Tablero de 6 x 8 casillas con el formato de input.txt: paredes, POIs, fuegos, puertas y puntos de entrada
+BOARD = """1100 1000 1001 1100 1001 1100 1000 1001
+0100 0000 0011 0100 0011 0110 0010 0011
+0100 0001 1100 1000 1000 1001 1100 1001
+0110 0011 0110 0010 0010 0011 0110 0011
+1100 1000 1000 1000 1001 1100 1001 1101
+0110 0010 0010 0010 0011 0110 0011 0111
+2 4 v
+5 1 f
+5 8 v
+2 2
+2 3
+3 2
+3 3
+3 4
+3 5
+4 4
+5 6
+5 7
+6 6
+1 3 1 4
+2 5 2 6
+2 8 3 8
+3 2 3 3
+4 4 5 4
+4 6 5 6
+4 7 4 8
+5 5 5 6
+1 6
+3 1
+4 8
+6 3
+"""
+
+# El mismo edificio con dos filas más: las filas 3 y 4 se repiten y el punto de entrada inferior baja a la fila 8
+LINES = BOARD.splitlines()
+TALL_BOARD = "\n".join(LINES[:4] + LINES[2:6] + LINES[6:-1] + ["8 3"]) + "\n"
+
+VARIANTS = [FlashPointIntelligent, FlashPointRandom]
+
+
+@pytest.fixture
+def board(tmp_path, monkeypatch):
+    # Escribir el tablero como input.txt en un directorio temporal y trabajar desde ahí
+    (tmp_path / "input.txt").write_text(BOARD)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FlashPointEngine, "boards", {})
+    return tmp_path
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_steps_count_each_model_step_once(board, variant):
+    # mesa incrementa model.steps en cada step(); el modelo no debe volver a contarlo
+    game = variant.simulate(3)
+    assert game.steps == len(game.dictionaryList)
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_board_size_comes_from_the_file(board, variant):
+    # process_file lee todas las filas de paredes y la partida usa las dimensiones del tablero leído
+    (board / "input.txt").write_text(TALL_BOARD)
+    walls = variant.process_file("input.txt")[0]
+    assert (len(walls), len(walls[0])) == (8, 8)
+    assert FlashPointEngine.boardSize(walls) == (10, 10)
+    game = variant.simulate(1)
+    assert (game.grid.width, game.grid.height) == (10, 10)
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_outcome_steps_match_recorded_game(board, variant):
+    # Los pasos de un GameOutcome son los mismos que los de la partida jugada con el registro de eventos completo
+    FlashPointEngine.initSimulationWorker(variant.__name__, "input.txt")
+    games = [variant.simulate(seed) for seed in range(5)]
+    outcomes = FlashPointEngine.playOutcomes(range(5), 0)
+    assert [outcome.steps for outcome in outcomes] == [len(game.dictionaryList) for game in games]
+
+
+def test_summarize_empty_batch():
+    summary = FlashPointEngine.summarizeOutcomes([])
+    assert summary["games"] == 0
+    assert summary["meanSteps"] == 0
+
+
+def test_sweep_resumes_by_parameters_and_seed(board):
+    # Reanudar un barrido con otros valores solo juega las combinaciones que el archivo aún no tiene
+    path = str(board / "sweep.jsonl")
+    FlashPointEngine.parameterSweep(FlashPointRandom, {"firefighters": [4, 6]}, 2, 1, path=path)
+    table = FlashPointEngine.parameterSweep(FlashPointRandom, {"firefighters": [5, 6]}, 2, 1, path=path)
+    with open(path) as file:
+        assert len(file.readlines()) == 6
+    assert table == FlashPointEngine.parameterSweep(FlashPointRandom, {"firefighters": [5, 6]}, 2, 1)
+
+
+@pytest.fixture
+def server(board, monkeypatch):
+    # Servidor con un hilo por petición en un puerto libre, jugando con FlashPointIntelligent
+    monkeypatch.setattr(FlashPointEngine.Server, "variant", FlashPointIntelligent)
+    monkeypatch.setattr(FlashPointEngine.Server, "model", None)
+    monkeypatch.setattr(FlashPointEngine.Server, "payloads", {})
+    httpd = FlashPointEngine.ThreadedServer(("127.0.0.1", 0), FlashPointEngine.Server)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url, **headers):
+    # Hacer un GET y devolver (estado, encabezados, cuerpo), también para respuestas 304
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+
+
+def test_stream_sends_each_step_as_it_is_played(server, monkeypatch):
+    # Cada evento "movimientos" de /simulacion es el paso que se acaba de jugar, igual que en la repetición final
+    models = []
+
+    class RecordedModel(FlashPointIntelligent.FireRescueModel):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            models.append(self)
+
+    monkeypatch.setattr(FlashPointIntelligent, "FireRescueModel", RecordedModel)
+    body = urllib.request.urlopen(server + "/simulacion").read().decode()
+
+    events = [dict(line.split(": ", 1) for line in block.split("\n")) for block in body.split("\n\n") if block]
+    steps = [event for event in events if event["event"] == "movimientos"]
+    game = models[0]
+    assert [int(event["id"]) for event in steps] == list(range(1, len(game.dictionaryList)))
+    for event in steps:
+        page = io.StringIO()
+        FlashPointEngine.writePendingActions(page, game.dictionaryList, FlashPointEngine.parse_actions, runs=[int(event["id"])])
+        assert json.loads(event["data"]) == json.loads(page.getvalue())
+
+
+@pytest.mark.parametrize("encoding, gzipped", [("gzip", True), ("gzip;q=0", False), ("identity, *;q=0.5", True),
+                                               ("br, gzip;q=0.0", False), ("", False)])
+def test_cached_payload_etag_per_encoding(server, encoding, gzipped):
+    # La versión comprimida y la sin comprimir tienen ETags distintos, y gzip;q=0 no recibe gzip
+    status, headers, body = get(server + "/mapa", **{"Accept-Encoding": encoding})
+    assert status == 200
+    assert (headers.get("Content-Encoding") == "gzip") == gzipped
+    assert headers["ETag"].endswith('-gzip"') == gzipped
+
+    assert get(server + "/mapa", **{"Accept-Encoding": encoding, "If-None-Match": headers["ETag"]})[0] == 304
+    other = "identity" if gzipped else "gzip"
+    assert get(server + "/mapa", **{"Accept-Encoding": other, "If-None-Match": headers["ETag"]})[0] == 200
+
+
+def test_movements_delta_format_decodes_to_full_replay(server):
+    # /movimientos?format=delta es el EventLog de la partida y se decodifica a la misma repetición que el JSON completo
+    status, headers, body = get(server + "/movimientos?format=delta")
+    assert status == 200
+    dictionaryList = FlashPointEngine.EventLog.fromPayload(json.loads(body)).toDictionaryList()
+    page = io.StringIO()
+    FlashPointEngine.writePendingActions(page, dictionaryList, FlashPointEngine.parse_actions)
+    assert json.loads(page.getvalue()) == json.loads(get(server + "/movimientos")[2])